@@ -0,0 +1,50 @@
+from django.conf import settings
+
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+
+
+class ApiError(ValueError):
+    pass
+
+
+def parse_fields(request, available):
+    """Разбирает параметр ?fields= в список полей ответа."""
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(available)
+    fields = [field for field in requested.split(',') if field]
+    unknown = set(fields) - set(available)
+    if unknown:
+        raise ApiError(
+            'Неизвестные поля: ' + ', '.join(sorted(unknown))
+        )
+    return fields
+
+
+def serialize(queryset, fields, available):
+    """Сериализует queryset в словари без создания объектов моделей."""
+    lookups = [available[field] for field in fields]
+    rows = []
+    for values in queryset.values_list(*lookups):
+        row = dict(zip(fields, values))
+        if 'image' in row:
+            row['image'] = (
+                settings.MEDIA_URL + row['image'] if row['image'] else None
+            )
+        rows.append(row)
+    return rows
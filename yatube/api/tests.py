@@ -0,0 +1,343 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from api.views import MAX_BATCH_SIZE, RATE_LIMIT_ITEMS
+from posts.hub import CacheHub, comments_topic
+from posts.live import RecentPosts, recent_posts
+from posts.models import Comment, Group, GroupStats, Post, User
+
+URL_API_INDEX = reverse('api:index')
+URL_API_FOLLOW = reverse('api:follow_index')
+URL_POST_BATCH = reverse('api:post_batch')
+URL_COMMENT_BATCH = reverse('api:comment_batch')
+URL_POSTS_SINCE = reverse('api:posts_since')
+
+
+class ReadApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='post_author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author,
+                text=f'Тестовый пост{i}',
+                group=cls.group
+            )
+            for i in range(3)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0],
+            author=cls.author,
+            text='Тестовый комментарий'
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_cursor_pagination(self):
+        """Курсор отдаёт следующую порцию постов без повторов."""
+        response = self.guest_client.get(URL_API_INDEX, {'limit': 2})
+        first_page = response.json()
+        self.assertEqual(
+            [row['id'] for row in first_page['results']],
+            [ReadApiTests.posts[2].id, ReadApiTests.posts[1].id]
+        )
+        response = self.guest_client.get(
+            URL_API_INDEX,
+            {'limit': 2, 'cursor': first_page['next_cursor']}
+        )
+        second_page = response.json()
+        self.assertEqual(
+            [row['id'] for row in second_page['results']],
+            [ReadApiTests.posts[0].id]
+        )
+        self.assertIsNone(second_page['next_cursor'])
+
+    def test_sparse_fields(self):
+        """Параметр fields ограничивает набор полей ответа."""
+        url_group = reverse(
+            'api:group_list',
+            kwargs={'slug': ReadApiTests.group.slug}
+        )
+        response = self.guest_client.get(url_group, {'fields': 'text,author'})
+        self.assertEqual(
+            response.json()['results'][0],
+            {'text': 'Тестовый пост2', 'author': 'post_author'}
+        )
+        response = self.guest_client.get(url_group, {'fields': 'password'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_detail_and_comments(self):
+        """Пост и его комментарии доступны по API."""
+        post_id = ReadApiTests.posts[0].id
+        response = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': post_id})
+        )
+        self.assertEqual(response.json()['text'], 'Тестовый пост0')
+        response = self.guest_client.get(
+            reverse('api:comments', kwargs={'post_id': post_id})
+        )
+        self.assertEqual(
+            response.json()['results'][0]['text'],
+            'Тестовый комментарий'
+        )
+        response = self.guest_client.get(
+            reverse('api:post_detail', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_etag_returns_not_modified(self):
+        """Повторный запрос с ETag получает 304."""
+        response = self.guest_client.get(URL_API_INDEX)
+        response = self.guest_client.get(
+            URL_API_INDEX,
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_gzip(self):
+        """Ответ сжимается, если клиент поддерживает gzip."""
+        response = self.guest_client.get(
+            URL_API_INDEX,
+            HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_follow_requires_auth(self):
+        """Лента подписок недоступна анонимному пользователю."""
+        response = self.guest_client.get(URL_API_FOLLOW)
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+
+class WriteApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def post_json(self, client, url, data):
+        return client.post(
+            url,
+            data=json.dumps(data),
+            content_type='application/json'
+        )
+
+    def test_post_batch_reports_errors_per_item(self):
+        """Валидные посты создаются, ошибки возвращаются по индексам."""
+        posts_count = Post.objects.count()
+        response = self.post_json(self.authorized_client, URL_POST_BATCH, [
+            {'text': 'Пост из API_1', 'group': WriteApiTests.group.id},
+            {'text': ''},
+            {'text': 'Пост из API_2', 'group': 0},
+            {'text': 'Пост из API_3'},
+            {'text': 'Пост из API_4', 'group': True},
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        data = response.json()
+        self.assertEqual(data['created'], 2)
+        self.assertEqual(
+            [error['index'] for error in data['errors']],
+            [1, 2, 4]
+        )
+        self.assertEqual(Post.objects.count(), posts_count + 2)
+        self.assertTrue(Post.objects.filter(
+            text='Пост из API_1',
+            author=WriteApiTests.user,
+            group=WriteApiTests.group
+        ).exists())
+        call_command('run_worker', processes=0, once=True, stdout=StringIO())
+        self.assertEqual(
+            GroupStats.objects.get(group=WriteApiTests.group).posts_count,
+            1
+        )
+
+    def test_comment_batch(self):
+        """Комментарии создаются пачкой для существующих постов."""
+        response = self.post_json(self.authorized_client, URL_COMMENT_BATCH, [
+            {'post': WriteApiTests.post.id, 'text': 'Коммент из API'},
+            {'post': 0, 'text': 'Коммент к несуществующему посту'},
+            {'post': True, 'text': 'Коммент с логическим id'},
+        ])
+        data = response.json()
+        self.assertEqual(data['created'], 1)
+        self.assertEqual(
+            [error['index'] for error in data['errors']],
+            [1, 2]
+        )
+        self.assertTrue(Comment.objects.filter(
+            post=WriteApiTests.post,
+            text='Коммент из API'
+        ).exists())
+
+    def test_write_requires_auth(self):
+        """Писать через API может только авторизованный пользователь."""
+        response = self.post_json(self.guest_client, URL_POST_BATCH, [
+            {'text': 'Пост гостя'}
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_rate_limit(self):
+        """Лимит на количество объектов от одного пользователя."""
+        items = [{'text': 'Пост'}] * MAX_BATCH_SIZE
+        for _ in range(RATE_LIMIT_ITEMS // MAX_BATCH_SIZE):
+            self.post_json(self.authorized_client, URL_POST_BATCH, items)
+        response = self.post_json(self.authorized_client, URL_POST_BATCH, [
+            {'text': 'Пост сверх лимита'}
+        ])
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+
+class LiveApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='post_author')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Старый пост',
+        )
+
+    def setUp(self):
+        recent_posts.reset()
+        self.guest_client = Client()
+
+    def run_on_commit(self):
+        """Выполняет обработчики on_commit: TestCase не фиксирует
+        транзакцию, поэтому сами они не вызываются."""
+        callbacks, connection.run_on_commit = connection.run_on_commit, []
+        for _, callback in callbacks:
+            callback()
+
+    def test_since_returns_only_new_posts(self):
+        """Опрос возвращает только посты новее переданного id."""
+        response = self.guest_client.get(URL_POSTS_SINCE)
+        self.assertEqual(
+            [row['text'] for row in response.json()['results']],
+            ['Старый пост']
+        )
+        new_post = Post.objects.create(
+            author=LiveApiTests.author,
+            text='Новый пост',
+        )
+        self.run_on_commit()
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(
+                URL_POSTS_SINCE,
+                {'after': LiveApiTests.post.id}
+            )
+        self.assertEqual(
+            [row['id'] for row in response.json()['results']],
+            [new_post.id]
+        )
+
+    def test_buffer_does_not_cover_evicted_posts(self):
+        """Граница старше вытесненных постов отправляет в базу,
+        даже если буфер после удаления поста уже не полон."""
+        buffer = RecentPosts(size=2)
+        posts = [
+            Post.objects.create(author=LiveApiTests.author, text=str(number))
+            for number in range(3)
+        ]
+        self.assertEqual(
+            [item['id'] for item in buffer.since(posts[0].id)],
+            [posts[1].id, posts[2].id]
+        )
+        self.assertIsNone(buffer.since(LiveApiTests.post.id))
+        buffer.remove(posts[2].id)
+        self.assertIsNone(buffer.since(LiveApiTests.post.id))
+        self.assertIsNone(
+            buffer.since(after_time=LiveApiTests.post.pub_date)
+        )
+
+    def test_push_without_loaded_author_rereads_post(self):
+        """Пост без загруженного автора перечитывается из базы,
+        а не отдельными запросами при сохранении."""
+        recent_posts.since()
+        post = Post.objects.get(pk=LiveApiTests.post.pk)
+        post.text = 'Изменённый пост'
+        post.save()
+        with self.assertNumQueries(0):
+            self.run_on_commit()
+        self.assertEqual(
+            [item['text'] for item in recent_posts.since()],
+            ['Изменённый пост']
+        )
+
+
+class LiveCommentsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='post_author')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_new_comment_is_returned_by_polling(self):
+        """Комментарий, добавленный через форму, приходит при опросе."""
+        url = reverse(
+            'api:comments_since',
+            kwargs={'post_id': LiveCommentsTests.post.id}
+        )
+        last = self.authorized_client.get(url).json()['last']
+        self.authorized_client.post(
+            reverse(
+                'posts:add_comment',
+                kwargs={'post_id': LiveCommentsTests.post.id}
+            ),
+            data={'text': 'Живой коммент'}
+        )
+        data = self.authorized_client.get(url, {'after': last}).json()
+        self.assertEqual(
+            [message['text'] for message in data['results']],
+            ['Живой коммент']
+        )
+        self.assertEqual(
+            self.authorized_client.get(url, {'after': data['last']}).json(),
+            {'last': data['last'], 'results': []}
+        )
+
+    def test_cache_hub_delivers_messages(self):
+        """Брокер через кеш доставляет сообщения по порядку."""
+        hub = CacheHub()
+        topic = comments_topic(LiveCommentsTests.post.id)
+        after = hub.last(topic)
+        hub.publish(topic, {'text': 'первый'})
+        hub.publish(topic, {'text': 'второй'})
+        self.assertEqual(
+            [message['text'] for _, message in hub.since(topic, after)],
+            ['первый', 'второй']
+        )
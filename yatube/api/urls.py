@@ -0,0 +1,26 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.post_list, name='index'),
+    path('posts/batch/', views.post_batch, name='post_batch'),
+    path('posts/since/', views.posts_since, name='posts_since'),
+    path('comments/batch/', views.comment_batch, name='comment_batch'),
+    path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('profile/<str:username>/', views.profile, name='profile'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.comments,
+        name='comments'
+    ),
+    path(
+        'posts/<int:post_id>/comments/since/',
+        views.comments_since,
+        name='comments_since'
+    ),
+    path('follow/', views.follow_index, name='follow_index'),
+]
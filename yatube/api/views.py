@@ -0,0 +1,352 @@
+import json
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.middleware.http import ConditionalGetMiddleware
+from django.utils.decorators import decorator_from_middleware
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET, require_POST
+
+from core.task_queue import enqueue
+
+from posts.forms import CommentForm, PostForm
+from posts.hub import comments_topic, get_hub, publish_comment
+from posts.live import recent_posts
+from posts.models import Comment, Group, Post, User
+from posts.ranking import bump_posts
+from posts.signals import posts_created
+from posts.tasks import warm_cache
+
+from .serializers import (
+    COMMENT_FIELDS, POST_FIELDS, ApiError, parse_fields, serialize
+)
+
+PAGE_SIZE: int = 20
+MAX_PAGE_SIZE: int = 100
+MAX_BATCH_SIZE: int = 500
+RATE_LIMIT_ITEMS: int = 1000
+RATE_LIMIT_WINDOW: int = 60
+
+conditional_get = decorator_from_middleware(ConditionalGetMiddleware)
+
+
+def read_api(view):
+    """Оборачивает view для чтения: ETag, gzip и ошибки в JSON."""
+    @require_GET
+    @gzip_page
+    @conditional_get
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'detail': str(error)}, status=400)
+        except Http404:
+            return JsonResponse({'detail': 'Не найдено'}, status=404)
+    return wrapper
+
+
+def paginate(request, queryset, available):
+    """Курсорная пагинация по убыванию id."""
+    fields = parse_fields(request, available)
+    try:
+        limit = int(request.GET.get('limit', PAGE_SIZE))
+        cursor = request.GET.get('cursor')
+        if cursor:
+            queryset = queryset.filter(id__lt=int(cursor))
+    except ValueError:
+        raise ApiError('Параметры limit и cursor должны быть числами')
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    fetch = fields if 'id' in fields else fields + ['id']
+    rows = serialize(queryset.order_by('-id')[:limit + 1], fetch, available)
+    next_cursor = rows[limit - 1]['id'] if len(rows) > limit else None
+    rows = rows[:limit]
+    if 'id' not in fields:
+        for row in rows:
+            del row['id']
+    return JsonResponse({'results': rows, 'next_cursor': next_cursor})
+
+
+def get_id_or_404(queryset):
+    object_id = queryset.values_list('id', flat=True).first()
+    if object_id is None:
+        raise Http404
+    return object_id
+
+
+@read_api
+def post_list(request):
+    return paginate(request, Post.objects.all(), POST_FIELDS)
+
+
+@read_api
+def group_posts(request, slug):
+    group_id = get_id_or_404(Group.objects.filter(slug=slug))
+    return paginate(
+        request,
+        Post.objects.filter(group_id=group_id),
+        POST_FIELDS
+    )
+
+
+@read_api
+def profile(request, username):
+    author_id = get_id_or_404(User.objects.filter(username=username))
+    return paginate(
+        request,
+        Post.objects.filter(author_id=author_id),
+        POST_FIELDS
+    )
+
+
+@read_api
+def post_detail(request, post_id):
+    fields = parse_fields(request, POST_FIELDS)
+    rows = serialize(Post.objects.filter(pk=post_id), fields, POST_FIELDS)
+    if not rows:
+        raise Http404
+    return JsonResponse(rows[0])
+
+
+@read_api
+def comments(request, post_id):
+    get_id_or_404(Post.objects.filter(pk=post_id))
+    return paginate(
+        request,
+        Comment.objects.filter(post_id=post_id),
+        COMMENT_FIELDS
+    )
+
+
+@read_api
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Требуется авторизация'}, status=401)
+    return paginate(
+        request,
+        Post.objects.filter(author__following__user=request.user),
+        POST_FIELDS
+    )
+
+
+def live_item(item):
+    return {
+        **item,
+        'image': settings.MEDIA_URL + item['image'] if item['image'] else None
+    }
+
+
+def parse_since(request):
+    """Разбирает границу ?after=<id> или ?since=<время> для живой ленты."""
+    after = request.GET.get('after')
+    since = request.GET.get('since')
+    try:
+        after = int(after or 0)
+    except ValueError:
+        raise ApiError('Параметр after должен быть числом')
+    if since is None:
+        return after, None
+    try:
+        since = parse_datetime(since)
+    except ValueError:
+        since = None
+    if since is None:
+        raise ApiError('Параметр since должен быть датой в формате ISO 8601')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return after, since
+
+
+def new_posts(after, since):
+    """Посты новее границы: из буфера в памяти, а если он не покрывает
+    границу — из базы."""
+    items = recent_posts.since(after, since)
+    if items is not None:
+        return [live_item(item) for item in items]
+    queryset = Post.objects.filter(id__gt=after)
+    if since is not None:
+        queryset = queryset.filter(pub_date__gt=since)
+    return serialize(
+        queryset.order_by('id')[:MAX_PAGE_SIZE],
+        list(POST_FIELDS),
+        POST_FIELDS
+    )
+
+
+@read_api
+def posts_since(request):
+    after, since = parse_since(request)
+    return JsonResponse({'results': new_posts(after, since)})
+
+
+@read_api
+def comments_since(request, post_id):
+    """Новые комментарии поста для периодического опроса.
+
+    Без ?after= отдаёт только номер последнего сообщения,
+    от которого клиент начинает опрос.
+    """
+    get_id_or_404(Post.objects.filter(pk=post_id))
+    hub = get_hub()
+    topic = comments_topic(post_id)
+    after = request.GET.get('after')
+    if after is None:
+        return JsonResponse({'last': hub.last(topic), 'results': []})
+    try:
+        after = int(after)
+    except ValueError:
+        raise ApiError('Параметр after должен быть числом')
+    messages = hub.since(topic, after)
+    return JsonResponse({
+        'last': messages[-1][0] if messages else after,
+        'results': [message for _, message in messages],
+    })
+
+
+def write_api(view):
+    """Оборачивает view для записи: авторизация, разбор JSON и лимиты."""
+    @require_POST
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse(
+                {'detail': 'Требуется авторизация'},
+                status=401
+            )
+        try:
+            items = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'detail': 'Некорректный JSON'}, status=400)
+        if not isinstance(items, list) or not all(
+            isinstance(item, dict) for item in items
+        ):
+            return JsonResponse(
+                {'detail': 'Ожидается список объектов'},
+                status=400
+            )
+        if len(items) > MAX_BATCH_SIZE:
+            return JsonResponse(
+                {'detail': f'Не больше {MAX_BATCH_SIZE} объектов за раз'},
+                status=400
+            )
+        if not take_rate_limit(request.user, len(items)):
+            response = JsonResponse(
+                {'detail': 'Превышен лимит запросов'},
+                status=429
+            )
+            response['Retry-After'] = RATE_LIMIT_WINDOW
+            return response
+        created, errors = view(request, items, *args, **kwargs)
+        return JsonResponse(
+            {'created': created, 'errors': errors},
+            status=201 if created or not errors else 400
+        )
+    return wrapper
+
+
+def take_rate_limit(user, count):
+    """Учитывает объекты пользователя в текущем окне лимита."""
+    key = f'api:rate:{user.pk}'
+    cache.add(key, 0, RATE_LIMIT_WINDOW)
+    try:
+        used = cache.incr(key, count)
+    except ValueError:
+        cache.set(key, count, RATE_LIMIT_WINDOW)
+        used = count
+    return used <= RATE_LIMIT_ITEMS
+
+
+def validate(items, form_class):
+    """Проверяет объекты формой, возвращает валидные формы и ошибки."""
+    forms, errors = [], []
+    for index, item in enumerate(items):
+        form = form_class(data=item)
+        if form.is_valid():
+            forms.append((index, form))
+        else:
+            errors.append(item_error(index, form.errors.get_json_data()))
+    return forms, errors
+
+
+def item_error(index, errors):
+    return {'index': index, 'errors': errors}
+
+
+def is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def missing(field, message):
+    return {field: [{'message': message, 'code': 'invalid_choice'}]}
+
+
+@write_api
+def post_batch(request, items):
+    groups = Group.objects.only('id').in_bulk([
+        item['group'] for item in items if is_id(item.get('group'))
+    ])
+    forms, errors = validate(
+        [{**item, 'group': None} for item in items],
+        PostForm
+    )
+    posts = []
+    for index, form in forms:
+        group_id = items[index].get('group')
+        if group_id is not None and (
+            not is_id(group_id) or group_id not in groups
+        ):
+            errors.append(item_error(
+                index,
+                missing('group', 'Группа не найдена')
+            ))
+            continue
+        post = form.save(commit=False)
+        post.author = request.user
+        post.group_id = group_id
+        posts.append(post)
+    with transaction.atomic():
+        Post.objects.bulk_create(posts)
+        posts_created(posts)
+    if posts:
+        enqueue(warm_cache)
+    errors.sort(key=lambda error: error['index'])
+    return len(posts), errors
+
+
+@write_api
+def comment_batch(request, items):
+    forms, errors = validate(items, CommentForm)
+    post_ids = {item.get('post') for item in items}
+    posts = Post.objects.only('id', 'pub_date').in_bulk([
+        post_id for post_id in post_ids if is_id(post_id)
+    ])
+    comments = []
+    for index, form in forms:
+        post_id = items[index].get('post')
+        post = posts.get(post_id) if is_id(post_id) else None
+        if post is None:
+            errors.append(item_error(
+                index,
+                missing('post', 'Пост не найден')
+            ))
+            continue
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post = post
+        comments.append(comment)
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments)
+    bump_posts(Counter(comment.post for comment in comments))
+    # SQLite не возвращает id из bulk_create: такие комментарии
+    # подписчики увидят при перезагрузке страницы.
+    for comment in comments:
+        if comment.pk is not None:
+            publish_comment(comment)
+    errors.sort(key=lambda error: error['index'])
+    return len(comments), errors
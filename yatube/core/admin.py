@@ -0,0 +1,82 @@
+from django.contrib import admin
+
+from .models import ErrorStat, ProfileReport, QueryStat, Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'priority',
+        'attempts',
+        'owner',
+        'duration',
+        'created',
+    )
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Task, TaskAdmin)
+
+
+class ProfileReportAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'method',
+        'path',
+        'mode',
+        'status_code',
+        'duration',
+        'user',
+        'created',
+    )
+    list_filter = ('mode', 'created')
+    search_fields = ('path',)
+    readonly_fields = (
+        'path',
+        'method',
+        'mode',
+        'user',
+        'status_code',
+        'duration',
+        'stats',
+        'flame',
+        'sql',
+        'templates',
+    )
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(ProfileReport, ProfileReportAdmin)
+
+
+class QueryStatAdmin(admin.ModelAdmin):
+    list_display = (
+        'view',
+        'sql',
+        'count',
+        'total_time',
+        'max_time',
+    )
+    list_filter = ('view',)
+    search_fields = ('sql',)
+
+
+admin.site.register(QueryStat, QueryStatAdmin)
+
+
+class ErrorStatAdmin(admin.ModelAdmin):
+    list_display = (
+        'path',
+        'status_code',
+        'count',
+        'last_seen',
+    )
+    list_filter = ('status_code',)
+    search_fields = ('path',)
+
+
+admin.site.register(ErrorStat, ErrorStatAdmin)
@@ -0,0 +1,62 @@
+import threading
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .flushing import BackgroundFlushMixin
+from .models import ErrorStat
+
+ERROR_PATHS_LIMIT: int = 1000
+OTHER_PATH: str = '*'
+
+
+class ErrorRecorder(BackgroundFlushMixin):
+    """Считает ошибки по адресам в памяти процесса и раз
+    в ERROR_STATS_FLUSH_INTERVAL секунд сбрасывает счётчики в ErrorStat.
+
+    Число разных адресов ограничено, чтобы перебор случайных адресов
+    не раздувал память: остальные учитываются под OTHER_PATH.
+    """
+
+    flush_interval_setting = 'ERROR_STATS_FLUSH_INTERVAL'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def record(self, path, status_code):
+        self.start_flushing()
+        key = (path[:500], status_code)
+        with self.lock:
+            if (
+                key not in self.pending
+                and len(self.pending) >= ERROR_PATHS_LIMIT
+            ):
+                key = (OTHER_PATH, status_code)
+            self.pending[key] = self.pending.get(key, 0) + 1
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        now = timezone.now()
+        for (path, status_code), count in pending.items():
+            stats = ErrorStat.objects.filter(
+                path=path,
+                status_code=status_code
+            )
+            if stats.update(count=F('count') + count, last_seen=now):
+                continue
+            try:
+                with transaction.atomic():
+                    ErrorStat.objects.create(
+                        path=path,
+                        status_code=status_code,
+                        count=count,
+                        last_seen=now,
+                    )
+            except IntegrityError:
+                stats.update(count=F('count') + count, last_seen=now)
+
+
+recorder = ErrorRecorder()
@@ -0,0 +1,50 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundFlushMixin:
+    """Сбрасывает накопленное в памяти процесса из фонового потока,
+    а не в обработчике запроса.
+
+    Поток запускается при первой записи в каждом процессе, в том числе
+    после fork. Интервал берётся из настройки flush_interval_setting,
+    0 отключает фоновый сброс: тогда flush вызывается явно.
+    """
+
+    flush_interval_setting = None
+
+    def start_flushing(self):
+        interval = getattr(settings, self.flush_interval_setting)
+        pid = os.getpid()
+        if not interval or getattr(self, 'flusher_pid', None) == pid:
+            return
+        with self.lock:
+            if getattr(self, 'flusher_pid', None) == pid:
+                return
+            self.flusher_pid = pid
+        threading.Thread(
+            target=self.flush_forever,
+            args=(interval,),
+            name=f'{type(self).__name__}-flush',
+            daemon=True
+        ).start()
+
+    def flush_forever(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не удалось сбросить %s', type(self).__name__)
+            finally:
+                connection.close()
+
+    def flush(self):
+        raise NotImplementedError
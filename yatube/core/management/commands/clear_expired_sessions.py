@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.sessions import SESSION_CLEAR_BATCH, clear_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Удаляет истёкшие сессии пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SESSION_CLEAR_BATCH
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Пауза между пачками в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        deleted = clear_expired_sessions(
+            options['batch_size'],
+            options['pause']
+        )
+        self.stdout.write(f'Удалено сессий: {deleted}')
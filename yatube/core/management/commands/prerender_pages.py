@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.prerender import prerender
+
+
+class Command(BaseCommand):
+    help = 'Рендерит страницы about и страницы ошибок в статичный HTML.'
+
+    def handle(self, *args, **options):
+        for path in prerender():
+            self.stdout.write(path)
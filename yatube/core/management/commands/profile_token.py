@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import PROFILE_PARAM, make_token
+
+
+class Command(BaseCommand):
+    help = 'Выдаёт токен профилирования запросов для сотрудника.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(
+            username=options['username'],
+            is_staff=True
+        ).first()
+        if user is None:
+            raise CommandError('Сотрудник с таким именем не найден')
+        token = make_token(user)
+        self.stdout.write(f'?{PROFILE_PARAM}={token}')
+        self.stdout.write(f'X-Profile: {token}')
@@ -0,0 +1,118 @@
+import time
+from multiprocessing import Pool, TimeoutError
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.module_loading import autodiscover_modules
+
+from core.task_queue import (
+    claim, enqueue, enqueue_periodic, requeue_stale, run_task, time_out,
+    worker_id
+)
+
+REQUEUE_INTERVAL: int = 60
+
+
+class PoolRunner:
+    """Выполняет задачи в пуле процессов не дольше TASK_TIMEOUT.
+
+    Зависшая задача снимается, а пул пересоздаётся, чтобы
+    освободить занятый ею процесс.
+    """
+
+    def __init__(self, processes):
+        self.processes = processes
+        self.pool = self.start_pool()
+
+    def start_pool(self):
+        return Pool(self.processes, initializer=connections.close_all)
+
+    def __call__(self, task_ids):
+        deadline = time.monotonic() + settings.TASK_TIMEOUT
+        results = [
+            (task_id, self.pool.apply_async(run_task, (task_id,)))
+            for task_id in task_ids
+        ]
+        statuses = []
+        hung = False
+        for task_id, result in results:
+            try:
+                statuses.append(
+                    result.get(max(0, deadline - time.monotonic()))
+                )
+            except TimeoutError:
+                statuses.append(time_out(task_id))
+                hung = True
+        if hung:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = self.start_pool()
+        return statuses
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркер фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=2,
+            help=(
+                'Размер пула процессов, 0 — выполнять в текущем процессе '
+                'без ограничения TASK_TIMEOUT.'
+            )
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить накопившиеся задачи и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('tasks')
+        processes = options['processes']
+        connections.close_all()
+        if not processes:
+            self.loop(
+                lambda ids: [run_task(task_id) for task_id in ids],
+                1,
+                options
+            )
+            return
+        runner = PoolRunner(processes)
+        try:
+            self.loop(runner, processes, options)
+        finally:
+            runner.close()
+
+    def loop(self, run_many, batch_size, options):
+        owner = worker_id()
+        last_enqueued = {}
+        last_requeued = 0.0
+        if not options['once']:
+            for name in settings.STARTUP_TASKS:
+                enqueue(name, priority=1)
+        while True:
+            if time.monotonic() - last_requeued >= REQUEUE_INTERVAL:
+                requeue_stale()
+                last_requeued = time.monotonic()
+            if not options['once']:
+                enqueue_periodic(last_enqueued)
+            task_ids = claim(batch_size, owner)
+            if task_ids:
+                statuses = run_many(task_ids)
+                self.stdout.write(
+                    f'Выполнено задач: {len(task_ids)}, '
+                    f'с ошибкой: {statuses.count("failed")}'
+                )
+            elif options['once']:
+                return
+            else:
+                time.sleep(options['poll_interval'])
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.sessions import BENCHMARK_ENGINES, benchmark_engine
+
+
+class Command(BaseCommand):
+    help = 'Измеряет накладные расходы движков сессий на один запрос.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=1000)
+        parser.add_argument(
+            '--engine',
+            action='append',
+            choices=BENCHMARK_ENGINES,
+            help='Движок для замера, по умолчанию все.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{"движок":16}{"чтение, мкс":>14}{"запросов":>10}'
+            f'{"запись, мкс":>14}{"запросов":>10}{"cookie":>8}'
+        )
+        for engine in options['engine'] or BENCHMARK_ENGINES:
+            result = benchmark_engine(engine, options['iterations'])
+            read_time, read_queries = result['read']
+            write_time, write_queries = result['write']
+            self.stdout.write(
+                f'{engine:16}{read_time:14.1f}{read_queries:10.2f}'
+                f'{write_time:14.1f}{write_queries:10.2f}'
+                f'{result["cookie_size"]:8d}'
+            )
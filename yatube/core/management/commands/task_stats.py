@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.task_queue import stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает метрики выполнения фоновых задач.'
+
+    def handle(self, *args, **options):
+        for row in stats():
+            self.stdout.write(
+                f'{row["name"]}: всего {row["total"]}, '
+                f'в очереди {row["pending"]}, ошибок {row["failed"]}, '
+                f'среднее {row["avg_duration"] or 0:.3f} с, '
+                f'максимум {row["max_duration"] or 0:.3f} с'
+            )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core.models import QueryStat
+from core.query_stats import recorder
+
+ORDERING = {
+    'total': '-total_time',
+    'count': '-count',
+    'max': '-max_time',
+}
+
+
+class Command(BaseCommand):
+    help = 'Показывает запросы, которые дольше всего занимают базу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--by', choices=ORDERING, default='total')
+        parser.add_argument('--view', help='Только запросы этого view.')
+
+    def handle(self, *args, **options):
+        recorder.flush()
+        stats = QueryStat.objects.order_by(ORDERING[options['by']])
+        if options['view']:
+            stats = stats.filter(view=options['view'])
+        for stat in stats[:options['limit']]:
+            self.stdout.write(
+                f'{stat.total_time:8.3f} s  {stat.count:8d} x  '
+                f'max {stat.max_time:.3f} s  {stat.view}\n    {stat.sql}'
+            )
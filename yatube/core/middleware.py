@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import connection
+from django.middleware.gzip import GZipMiddleware
+
+from .profiling import profile_request, requested_token, token_user_id
+from .query_stats import recorder
+
+
+class HTMLGZipMiddleware(GZipMiddleware):
+    """Сжимает gzip только HTML-страницы больше порогового размера."""
+
+    def process_response(self, request, response):
+        if not response.get('Content-Type', '').startswith('text/html'):
+            return response
+        if (
+            not response.streaming
+            and len(response.content) < settings.GZIP_MIN_LENGTH
+        ):
+            return response
+        return super().process_response(request, response)
+
+
+class ProfilingMiddleware:
+    """Профилирует запрос сотрудника с подписанным токеном.
+
+    Остальные запросы проходят после одной проверки параметра
+    и заголовка, без обращения к пользователю и профайлеру.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = requested_token(request)
+        if token is None:
+            return self.get_response(request)
+        user_id = token_user_id(token)
+        if (
+            user_id is None
+            or not request.user.is_staff
+            or request.user.pk != user_id
+        ):
+            return self.get_response(request)
+        return profile_request(self.get_response, request, user_id)
+
+
+class QueryStatsMiddleware:
+    """Собирает время SQL-запросов по отпечаткам и view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with connection.execute_wrapper(recorder.wrapper(request)):
+            return self.get_response(request)
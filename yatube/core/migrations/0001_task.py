@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='задача')),
+                ('args', models.TextField(default='[]', verbose_name='аргументы')),
+                ('priority', models.SmallIntegerField(default=0, verbose_name='приоритет')),
+                ('status', models.CharField(choices=[('pending', 'в очереди'), ('running', 'выполняется'), ('done', 'выполнена'), ('failed', 'ошибка')], default='pending', max_length=10, verbose_name='статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='попыток')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='максимум попыток')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='запустить после')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='дата создания')),
+                ('started', models.DateTimeField(blank=True, null=True, verbose_name='начало выполнения')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='конец выполнения')),
+                ('duration', models.FloatField(blank=True, null=True, verbose_name='длительность, с')),
+                ('error', models.TextField(blank=True, verbose_name='ошибка')),
+            ],
+            options={
+                'ordering': ['-priority', 'run_after'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'priority', 'run_after'], name='task_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0001_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileReport',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, verbose_name='адрес')),
+                ('method', models.CharField(max_length=10, verbose_name='метод')),
+                ('mode', models.CharField(choices=[('cprofile', 'cProfile'), ('sample', 'сэмплирование')], max_length=10, verbose_name='режим')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='дата создания')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='код ответа')),
+                ('duration', models.FloatField(verbose_name='длительность, с')),
+                ('stats', models.TextField(blank=True, verbose_name='статистика cProfile')),
+                ('flame', models.TextField(blank=True, verbose_name='стеки для flame graph')),
+                ('sql', models.TextField(default='[]', verbose_name='SQL-запросы')),
+                ('templates', models.TextField(default='[]', verbose_name='шаблоны')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profile_reports', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+    ]
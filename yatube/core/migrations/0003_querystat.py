@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_profilereport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=32, verbose_name='отпечаток')),
+                ('view', models.CharField(max_length=200, verbose_name='view')),
+                ('sql', models.TextField(verbose_name='нормализованный запрос')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='количество')),
+                ('total_time', models.FloatField(default=0, verbose_name='суммарное время, с')),
+                ('max_time', models.FloatField(default=0, verbose_name='максимальное время, с')),
+            ],
+            options={
+                'ordering': ['-total_time'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='querystat',
+            constraint=models.UniqueConstraint(fields=('fingerprint', 'view'), name='unique_query_per_view'),
+        ),
+    ]
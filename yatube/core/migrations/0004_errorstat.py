@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:50
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_querystat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ErrorStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, verbose_name='адрес')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='код ответа')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='количество')),
+                ('last_seen', models.DateTimeField(default=django.utils.timezone.now, verbose_name='последний раз')),
+            ],
+            options={
+                'ordering': ['-count'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='errorstat',
+            constraint=models.UniqueConstraint(fields=('path', 'status_code'), name='unique_error_per_path'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_errorstat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='имя в хранилище')),
+                ('sha256', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('size', models.PositiveIntegerField(verbose_name='размер, байт')),
+                ('refcount', models.PositiveIntegerField(default=1, verbose_name='число ссылок')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='дата загрузки')),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+    ]
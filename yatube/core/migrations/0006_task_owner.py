@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_storedfile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='owner',
+            field=models.CharField(blank=True, max_length=100, verbose_name='воркер'),
+        ),
+    ]
@@ -0,0 +1,247 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'в очереди'),
+        (RUNNING, 'выполняется'),
+        (DONE, 'выполнена'),
+        (FAILED, 'ошибка'),
+    )
+
+    name = models.CharField(
+        verbose_name='задача',
+        max_length=200
+    )
+    args = models.TextField(
+        verbose_name='аргументы',
+        default='[]'
+    )
+    priority = models.SmallIntegerField(
+        verbose_name='приоритет',
+        default=0
+    )
+    status = models.CharField(
+        verbose_name='статус',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='попыток',
+        default=0
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='максимум попыток',
+        default=3
+    )
+    run_after = models.DateTimeField(
+        verbose_name='запустить после',
+        default=timezone.now
+    )
+    created = models.DateTimeField(
+        verbose_name='дата создания',
+        auto_now_add=True
+    )
+    started = models.DateTimeField(
+        verbose_name='начало выполнения',
+        blank=True,
+        null=True
+    )
+    owner = models.CharField(
+        verbose_name='воркер',
+        max_length=100,
+        blank=True
+    )
+    finished = models.DateTimeField(
+        verbose_name='конец выполнения',
+        blank=True,
+        null=True
+    )
+    duration = models.FloatField(
+        verbose_name='длительность, с',
+        blank=True,
+        null=True
+    )
+    error = models.TextField(
+        verbose_name='ошибка',
+        blank=True
+    )
+
+    def __str__(self) -> str:
+        return f'{self.name} ({self.status})'
+
+    class Meta:
+        ordering = ['-priority', 'run_after']
+        indexes = [
+            models.Index(
+                fields=['status', 'priority', 'run_after'],
+                name='task_queue_idx'
+            )
+        ]
+
+
+class ProfileReport(models.Model):
+    CPROFILE = 'cprofile'
+    SAMPLE = 'sample'
+    MODE_CHOICES = (
+        (CPROFILE, 'cProfile'),
+        (SAMPLE, 'сэмплирование'),
+    )
+
+    path = models.CharField(
+        verbose_name='адрес',
+        max_length=500
+    )
+    method = models.CharField(
+        verbose_name='метод',
+        max_length=10
+    )
+    mode = models.CharField(
+        verbose_name='режим',
+        max_length=10,
+        choices=MODE_CHOICES
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='profile_reports',
+        verbose_name='Пользователь'
+    )
+    created = models.DateTimeField(
+        verbose_name='дата создания',
+        auto_now_add=True
+    )
+    status_code = models.PositiveSmallIntegerField(
+        verbose_name='код ответа'
+    )
+    duration = models.FloatField(
+        verbose_name='длительность, с'
+    )
+    stats = models.TextField(
+        verbose_name='статистика cProfile',
+        blank=True
+    )
+    flame = models.TextField(
+        verbose_name='стеки для flame graph',
+        blank=True
+    )
+    sql = models.TextField(
+        verbose_name='SQL-запросы',
+        default='[]'
+    )
+    templates = models.TextField(
+        verbose_name='шаблоны',
+        default='[]'
+    )
+
+    def __str__(self) -> str:
+        return f'{self.method} {self.path}'
+
+    class Meta:
+        ordering = ['-created']
+
+
+class QueryStat(models.Model):
+    fingerprint = models.CharField(
+        verbose_name='отпечаток',
+        max_length=32
+    )
+    view = models.CharField(
+        verbose_name='view',
+        max_length=200
+    )
+    sql = models.TextField(
+        verbose_name='нормализованный запрос'
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='количество',
+        default=0
+    )
+    total_time = models.FloatField(
+        verbose_name='суммарное время, с',
+        default=0
+    )
+    max_time = models.FloatField(
+        verbose_name='максимальное время, с',
+        default=0
+    )
+
+    def __str__(self) -> str:
+        return f'{self.view}: {self.sql[:50]}'
+
+    class Meta:
+        ordering = ['-total_time']
+        constraints = [
+            models.UniqueConstraint(
+                fields=('fingerprint', 'view'),
+                name='unique_query_per_view'
+            )
+        ]
+
+
+class ErrorStat(models.Model):
+    path = models.CharField(
+        verbose_name='адрес',
+        max_length=500
+    )
+    status_code = models.PositiveSmallIntegerField(
+        verbose_name='код ответа'
+    )
+    count = models.PositiveIntegerField(
+        verbose_name='количество',
+        default=0
+    )
+    last_seen = models.DateTimeField(
+        verbose_name='последний раз',
+        default=timezone.now
+    )
+
+    def __str__(self) -> str:
+        return f'{self.status_code} {self.path}'
+
+    class Meta:
+        ordering = ['-count']
+        constraints = [
+            models.UniqueConstraint(
+                fields=('path', 'status_code'),
+                name='unique_error_per_path'
+            )
+        ]
+
+
+class StoredFile(models.Model):
+    name = models.CharField(
+        verbose_name='имя в хранилище',
+        max_length=255,
+        unique=True
+    )
+    sha256 = models.CharField(
+        verbose_name='SHA-256',
+        max_length=64
+    )
+    size = models.PositiveIntegerField(
+        verbose_name='размер, байт'
+    )
+    refcount = models.PositiveIntegerField(
+        verbose_name='число ссылок',
+        default=1
+    )
+    created = models.DateTimeField(
+        verbose_name='дата загрузки',
+        auto_now_add=True
+    )
+
+    def __str__(self) -> str:
+        return f'{self.name} ({self.refcount})'
+
+    class Meta:
+        ordering = ['-created']
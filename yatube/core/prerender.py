@@ -0,0 +1,80 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils.safestring import mark_safe
+
+from .context_processors.year import year
+
+PATH_PLACEHOLDER = mark_safe('<!--path-->')
+YEAR_PLACEHOLDER = mark_safe('<!--year-->')
+
+PRERENDERED_PAGES = {
+    'about/author.html': ('about:author', {}),
+    'about/tech.html': ('about:tech', {}),
+    'core/404.html': (None, {'path': PATH_PLACEHOLDER}),
+    'core/403.html': (None, {'path': PATH_PLACEHOLDER}),
+    'core/500.html': (None, {'path': PATH_PLACEHOLDER}),
+}
+
+_pages = {}
+
+
+def page_path(template_name):
+    return os.path.join(settings.PRERENDERED_ROOT, template_name)
+
+
+def prerender():
+    """Рендерит статичные страницы для анонимного посетителя в файлы."""
+    factory = RequestFactory()
+    written = []
+    for template_name, (url_name, context) in PRERENDERED_PAGES.items():
+        url = reverse(url_name) if url_name else '/'
+        request = factory.get(url)
+        request.user = AnonymousUser()
+        request.resolver_match = resolve(url) if url_name else None
+        html = render_to_string(
+            template_name,
+            {**context, 'year': YEAR_PLACEHOLDER},
+            request
+        )
+        path = page_path(template_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as page:
+            page.write(html)
+        written.append(path)
+    _pages.clear()
+    return written
+
+
+def fill(html, path=''):
+    """Подставляет в готовую страницу то, что меняется после рендера."""
+    return html.replace(PATH_PLACEHOLDER, path).replace(
+        YEAR_PLACEHOLDER,
+        str(year(None)['year'])
+    )
+
+
+def get_page(template_name):
+    """Заранее отрендеренная страница из памяти или None.
+
+    Время изменения файла сверяется при каждом вызове: страницы,
+    отрендеренные после старта процесса или заново, подхватываются
+    без перезапуска, а отсутствие файла не запоминается.
+    """
+    path = page_path(template_name)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        cached = _pages.get(template_name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, encoding='utf-8') as page:
+            html = page.read()
+    except OSError:
+        _pages.pop(template_name, None)
+        return None
+    _pages[template_name] = (mtime, html)
+    return html
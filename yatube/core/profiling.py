@@ -0,0 +1,166 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.core import signing
+from django.db import connection
+from django.template.base import Template
+
+from .models import ProfileReport
+
+PROFILE_PARAM: str = '_profile'
+PROFILE_MODE_PARAM: str = '_profile_mode'
+PROFILE_HEADER: str = 'HTTP_X_PROFILE'
+PROFILE_SALT: str = 'core.profiling'
+PROFILE_TOKEN_MAX_AGE: int = 24 * 60 * 60
+SAMPLE_INTERVAL: float = 0.005
+STATS_LIMIT: int = 60
+
+_state = threading.local()
+_patch_lock = threading.Lock()
+_active_profiles = 0
+_original_render = Template._render
+
+
+def make_token(user):
+    """Подписанный токен, включающий профилирование для сотрудника."""
+    return signing.dumps({'user': user.pk}, salt=PROFILE_SALT)
+
+
+def token_user_id(token):
+    try:
+        return signing.loads(
+            token,
+            salt=PROFILE_SALT,
+            max_age=PROFILE_TOKEN_MAX_AGE
+        )['user']
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+
+
+def requested_token(request):
+    return request.GET.get(PROFILE_PARAM) or request.META.get(PROFILE_HEADER)
+
+
+def _timed_render(self, context):
+    timings = getattr(_state, 'templates', None)
+    if timings is None:
+        return _original_render(self, context)
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        timings.append({
+            'name': self.origin.template_name if self.origin else None,
+            'duration': time.perf_counter() - start,
+        })
+
+
+def _patch_templates():
+    global _active_profiles
+    with _patch_lock:
+        _active_profiles += 1
+        Template._render = _timed_render
+
+
+def _unpatch_templates():
+    global _active_profiles
+    with _patch_lock:
+        _active_profiles -= 1
+        if not _active_profiles:
+            Template._render = _original_render
+
+
+class Sampler(threading.Thread):
+    """Сэмплирующий профайлер: снимает стек потока запроса
+    каждые SAMPLE_INTERVAL секунд и копит свёрнутые стеки."""
+
+    def __init__(self, thread_id):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_filename}:{code.co_name}')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return '\n'.join(
+            f'{stack} {count}' for stack, count in self.stacks.most_common()
+        )
+
+
+def profile_request(get_response, request, user_id):
+    """Выполняет запрос под профайлером и сохраняет отчёт."""
+    mode = request.GET.get(PROFILE_MODE_PARAM, ProfileReport.CPROFILE)
+    if mode not in dict(ProfileReport.MODE_CHOICES):
+        mode = ProfileReport.CPROFILE
+    queries = []
+    start = time.perf_counter()
+
+    def record_query(execute, sql, params, many, context):
+        query_start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            queries.append({
+                'sql': sql,
+                'start': query_start - start,
+                'duration': time.perf_counter() - query_start,
+            })
+
+    _state.templates = []
+    _patch_templates()
+    profiler = sampler = None
+    if mode == ProfileReport.SAMPLE:
+        sampler = Sampler(threading.get_ident())
+        sampler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        with connection.execute_wrapper(record_query):
+            response = get_response(request)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.stopped.set()
+            sampler.join()
+        _unpatch_templates()
+        templates, _state.templates = _state.templates, None
+    duration = time.perf_counter() - start
+    stats = ''
+    if profiler is not None:
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats(
+            'cumulative'
+        ).print_stats(STATS_LIMIT)
+        stats = output.getvalue()
+    report = ProfileReport.objects.create(
+        path=request.get_full_path()[:500],
+        method=request.method,
+        mode=mode,
+        user_id=user_id,
+        status_code=response.status_code,
+        duration=duration,
+        stats=stats,
+        flame=sampler.collapsed() if sampler is not None else '',
+        sql=json.dumps(queries),
+        templates=json.dumps(templates),
+    )
+    response['X-Profile-Report'] = report.pk
+    return response
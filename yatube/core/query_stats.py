@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .flushing import BackgroundFlushMixin
+from .models import QueryStat
+
+logger = logging.getLogger('yatube.slow_queries')
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """Заменяет литералы и списки IN, чтобы похожие запросы совпадали."""
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.md5(normalized_sql.encode()).hexdigest()
+
+
+def caller_frame():
+    """Ближайший кадр стека из кода проекта, а не из Django."""
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        filename = os.path.abspath(frame.filename)
+        if (
+            filename.startswith(settings.BASE_DIR)
+            and 'site-packages' not in filename
+            and not filename.endswith('query_stats.py')
+        ):
+            return f'{frame.filename}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+class QueryRecorder(BackgroundFlushMixin):
+    """Копит статистику запросов в памяти процесса и раз
+    в QUERY_STATS_FLUSH_INTERVAL секунд сбрасывает её в QueryStat."""
+
+    flush_interval_setting = 'QUERY_STATS_FLUSH_INTERVAL'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def wrapper(self, request):
+        def record_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.record(
+                    sql,
+                    time.perf_counter() - start,
+                    request.resolver_match.view_name
+                    if request.resolver_match else '-'
+                )
+        return record_query
+
+    def record(self, sql, duration, view):
+        self.start_flushing()
+        normalized = normalize(sql)
+        key = (fingerprint(normalized), view)
+        with self.lock:
+            count, total, longest, _ = self.pending.get(
+                key,
+                (0, 0.0, 0.0, normalized)
+            )
+            self.pending[key] = (
+                count + 1,
+                total + duration,
+                max(longest, duration),
+                normalized
+            )
+        if duration >= settings.SLOW_QUERY_THRESHOLD:
+            logger.warning(
+                '%.3f s in %s at %s: %s',
+                duration,
+                view,
+                caller_frame(),
+                sql
+            )
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for (digest, view), (count, total, longest, sql) in pending.items():
+            updated = QueryStat.objects.filter(
+                fingerprint=digest,
+                view=view
+            ).update(
+                count=F('count') + count,
+                total_time=F('total_time') + total,
+                max_time=Greatest('max_time', longest),
+            )
+            if updated:
+                continue
+            try:
+                with transaction.atomic():
+                    QueryStat.objects.create(
+                        fingerprint=digest,
+                        view=view,
+                        sql=sql,
+                        count=count,
+                        total_time=total,
+                        max_time=longest,
+                    )
+            except IntegrityError:
+                QueryStat.objects.filter(
+                    fingerprint=digest,
+                    view=view
+                ).update(
+                    count=F('count') + count,
+                    total_time=F('total_time') + total,
+                    max_time=Greatest('max_time', longest),
+                )
+
+
+recorder = QueryRecorder()
@@ -0,0 +1,72 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+SESSION_CLEAR_BATCH: int = 1000
+BENCHMARK_ENGINES = ('db', 'cached_db', 'cache', 'signed_cookies')
+BENCHMARK_PAYLOAD = {
+    '_auth_user_id': '1',
+    '_auth_user_backend': 'django.contrib.auth.backends.ModelBackend',
+    '_auth_user_hash': '0' * 64,
+}
+
+
+def session_store(engine=None):
+    return import_module(engine or settings.SESSION_ENGINE).SessionStore
+
+
+def clear_expired_sessions(batch_size=SESSION_CLEAR_BATCH, pause=0):
+    """Удаляет истёкшие сессии пачками, не блокируя таблицу надолго.
+
+    Для движков без таблицы сессий вызывает их собственную очистку.
+    """
+    store = session_store()
+    if not hasattr(store, 'get_model_class'):
+        store.clear_expired()
+        return 0
+    model = store.get_model_class()
+    deleted = 0
+    while True:
+        keys = list(model.objects.filter(
+            expire_date__lt=timezone.now()
+        ).values_list('session_key', flat=True)[:batch_size])
+        if not keys:
+            return deleted
+        deleted += model.objects.filter(session_key__in=keys).delete()[0]
+        if pause:
+            time.sleep(pause)
+
+
+def benchmark_engine(engine, iterations):
+    """Время и запросы к базе на один запрос с сессией.
+
+    Считает отдельно запросы, которые только читают сессию,
+    и запросы, которые её меняют.
+    """
+    store_class = session_store(f'django.contrib.sessions.backends.{engine}')
+    session = store_class()
+    session.update(BENCHMARK_PAYLOAD)
+    session.save()
+    key = session.session_key
+    result = {'engine': engine, 'cookie_size': len(key)}
+    for mode in ('read', 'write'):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for number in range(iterations):
+                session = store_class(key)
+                session.get('_auth_user_id')
+                if mode == 'write':
+                    session['counter'] = number
+                    session.save()
+                    key = session.session_key
+            duration = time.perf_counter() - start
+        result[mode] = (
+            duration / iterations * 1e6,
+            len(queries) / iterations
+        )
+    store_class(key).delete()
+    return result
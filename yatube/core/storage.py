@@ -0,0 +1,180 @@
+import gzip
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import StoredFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from storages.backends.s3boto3 import S3Boto3Storage
+except ImportError:
+    S3Boto3Storage = None
+
+HASH_CHUNK_SIZE: int = 64 * 1024
+SPOOL_MAX_SIZE: int = 5 * 1024 * 1024
+SHARD_DEPTH: int = 2
+SHARD_WIDTH: int = 2
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.map'
+)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хранилище статики с хешами в именах и сжатыми копиями файлов.
+
+    Рядом с каждым хешированным файлом кладутся варианты .gz и,
+    если установлен пакет brotli, .br.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in sorted(hashed_names):
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        variants = {'.gz': gzip.compress(content, compresslevel=9)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(content)
+        for suffix, compressed in variants.items():
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+
+
+def sharded_name(directory, digest, extension):
+    """Имя файла по хешу с вложенными каталогами из его начала."""
+    shards = [
+        digest[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH]
+        for level in range(SHARD_DEPTH)
+    ]
+    return posixpath.join(directory, *shards, digest + extension)
+
+
+def add_reference(name, digest, size):
+    updated = StoredFile.objects.filter(name=name).update(
+        refcount=F('refcount') + 1
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            StoredFile.objects.create(name=name, sha256=digest, size=size)
+    except IntegrityError:
+        StoredFile.objects.filter(name=name).update(
+            refcount=F('refcount') + 1
+        )
+
+
+def release_reference(name):
+    """Снимает ссылку на файл; True, если это была последняя.
+
+    Файлы без записи в StoredFile хранилище не учитывает
+    и не удаляет.
+    """
+    with transaction.atomic():
+        stored = StoredFile.objects.select_for_update().filter(
+            name=name
+        ).first()
+        if stored is None:
+            return False
+        if stored.refcount > 1:
+            StoredFile.objects.filter(pk=stored.pk).update(
+                refcount=F('refcount') - 1
+            )
+            return False
+        stored.delete()
+        return True
+
+
+class ContentAddressedStorageMixin:
+    """Хранит загрузки по SHA-256 содержимого.
+
+    Хеш считается при потоковом чтении загрузки, файл кладётся
+    в каталоги по первым символам хеша, а одинаковые файлы
+    хранятся один раз со счётчиком ссылок в StoredFile.
+    delete снимает одну ссылку, а файл удаляется после коммита
+    транзакции, снявшей последнюю.
+    """
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+            for chunk in content.chunks(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+            directory, basename = posixpath.split(name)
+            extension = posixpath.splitext(basename)[1].lower()
+            name = sharded_name(directory, digest.hexdigest(), extension)
+            add_reference(name, digest.hexdigest(), size)
+            if self.exists(name):
+                self.touch(name)
+            else:
+                spool.seek(0)
+                super()._save(name, File(spool, name))
+        return name
+
+    def touch(self, name):
+        """Обновляет время изменения файла при повторной загрузке,
+        чтобы сборщик мусора не счёл его старым."""
+        try:
+            os.utime(self.path(name))
+        except (NotImplementedError, OSError):
+            pass
+
+    def delete(self, name):
+        if release_reference(name):
+            delete_file = super().delete
+            transaction.on_commit(lambda: delete_file(name))
+
+    def discard(self, name):
+        """Удаляет файл сразу, не глядя на счётчик ссылок."""
+        StoredFile.objects.filter(name=name).delete()
+        super().delete(name)
+
+
+class ContentAddressedFileSystemStorage(
+    ContentAddressedStorageMixin,
+    FileSystemStorage
+):
+    pass
+
+
+if S3Boto3Storage is not None:
+    class ContentAddressedS3Storage(
+        ContentAddressedStorageMixin,
+        S3Boto3Storage
+    ):
+        """То же для S3-совместимых хранилищ (django-storages).
+
+        Для локального стенда вроде MinIO достаточно указать
+        AWS_S3_ENDPOINT_URL.
+        """
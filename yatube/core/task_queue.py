@@ -0,0 +1,183 @@
+import json
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Task
+
+RETRY_DELAY: int = 30
+LEASE_GRACE: int = 60
+PRUNE_BATCH: int = 1000
+
+registry = {}
+
+
+def task(func):
+    """Регистрирует функцию как фоновую задачу."""
+    registry[f'{func.__module__}.{func.__name__}'] = func
+    return func
+
+
+def task_name(func_or_name):
+    if callable(func_or_name):
+        return f'{func_or_name.__module__}.{func_or_name.__name__}'
+    return func_or_name
+
+
+def enqueue(func_or_name, *args, priority=0, delay=0, max_attempts=3):
+    """Ставит задачу в очередь и сразу возвращает управление."""
+    return Task.objects.create(
+        name=task_name(func_or_name),
+        args=json.dumps(args),
+        priority=priority,
+        max_attempts=max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def worker_id():
+    """Имя воркера, которым помечаются взятые им задачи."""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}'
+
+
+def claim(limit, owner=''):
+    """Забирает из очереди до limit задач для выполнения.
+
+    Задача считается взятой, только если обновление статуса
+    прошло у этого воркера, поэтому несколько воркеров
+    не выполнят одну задачу дважды. Попытка засчитывается
+    при взятии, так что и задача, роняющая воркер, не будет
+    перезапускаться бесконечно.
+    """
+    candidates = Task.objects.filter(
+        status=Task.PENDING,
+        run_after__lte=timezone.now()
+    ).values_list('id', flat=True)[:limit]
+    claimed = []
+    for task_id in candidates:
+        updated = Task.objects.filter(
+            id=task_id,
+            status=Task.PENDING
+        ).update(
+            status=Task.RUNNING,
+            started=timezone.now(),
+            owner=owner,
+            attempts=F('attempts') + 1
+        )
+        if updated:
+            claimed.append(task_id)
+    return claimed
+
+
+def requeue_stale(timeout=None):
+    """Возвращает в очередь задачи упавших воркеров.
+
+    Живой воркер сам снимает задачу по истечении TASK_TIMEOUT,
+    поэтому задача, выполняющаяся дольше TASK_TIMEOUT и LEASE_GRACE,
+    уже никем не выполняется. Исчерпавшие попытки помечаются ошибкой.
+    """
+    timeout = timeout or settings.TASK_TIMEOUT
+    now = timezone.now()
+    stale = Task.objects.filter(
+        status=Task.RUNNING,
+        started__lt=now - timedelta(seconds=timeout + LEASE_GRACE)
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED,
+        error='Воркер не завершил задачу',
+        finished=now
+    )
+    return stale.update(status=Task.PENDING, owner='')
+
+
+def retry_or_fail(queued, error):
+    """Откладывает повтор упавшей задачи или помечает её ошибкой."""
+    queued.error = error
+    if queued.attempts < queued.max_attempts:
+        queued.status = Task.PENDING
+        queued.run_after = timezone.now() + timedelta(
+            seconds=RETRY_DELAY * 2 ** (queued.attempts - 1)
+        )
+    else:
+        queued.status = Task.FAILED
+
+
+def time_out(task_id, timeout=None):
+    """Снимает задачу, не уложившуюся в TASK_TIMEOUT."""
+    timeout = timeout or settings.TASK_TIMEOUT
+    queued = Task.objects.get(id=task_id)
+    if queued.status != Task.RUNNING:
+        return queued.status
+    retry_or_fail(queued, f'Задача не уложилась в {timeout} с')
+    queued.duration = timeout
+    queued.finished = timezone.now()
+    queued.save()
+    return queued.status
+
+
+def run_task(task_id):
+    """Выполняет взятую задачу и записывает результат и время."""
+    close_old_connections()
+    autodiscover_modules('tasks')
+    queued = Task.objects.get(id=task_id)
+    start = time.monotonic()
+    try:
+        registry[queued.name](*json.loads(queued.args))
+    except Exception:
+        retry_or_fail(queued, traceback.format_exc())
+    else:
+        queued.status = Task.DONE
+        queued.error = ''
+    queued.duration = time.monotonic() - start
+    queued.finished = timezone.now()
+    queued.save()
+    return queued.status
+
+
+def enqueue_periodic(last_enqueued):
+    """Ставит в очередь периодические задачи, у которых вышел интервал."""
+    now = time.monotonic()
+    for name, interval in settings.PERIODIC_TASKS.items():
+        if now - last_enqueued.get(name, -interval) < interval:
+            continue
+        last_enqueued[name] = now
+        if not Task.objects.filter(
+            name=name,
+            status__in=(Task.PENDING, Task.RUNNING)
+        ).exists():
+            enqueue(name)
+
+
+def prune_finished(days=None, batch_size=PRUNE_BATCH):
+    """Удаляет пачками выполненные и упавшие задачи старше days дней."""
+    days = days or settings.TASK_RETENTION_DAYS
+    finished = Task.objects.filter(
+        status__in=(Task.DONE, Task.FAILED),
+        finished__lt=timezone.now() - timedelta(days=days)
+    )
+    deleted = 0
+    while True:
+        ids = list(finished.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += Task.objects.filter(id__in=ids).delete()[0]
+
+
+def stats():
+    """Метрики выполнения задач по именам."""
+    return Task.objects.values('name').annotate(
+        total=Count('id'),
+        failed=Count('id', filter=Q(status=Task.FAILED)),
+        pending=Count('id', filter=Q(status=Task.PENDING)),
+        avg_duration=Avg('duration'),
+        max_duration=Max('duration'),
+    ).order_by('name')
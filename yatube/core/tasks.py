@@ -0,0 +1,13 @@
+from .task_queue import prune_finished, task
+
+from . import sessions
+
+
+@task
+def clear_expired_sessions():
+    sessions.clear_expired_sessions()
+
+
+@task
+def prune_tasks():
+    prune_finished()
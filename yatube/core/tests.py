@@ -1,10 +1,583 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+from django.utils import timezone
 
 from http import HTTPStatus
 
+from core import prerender
+from core.error_stats import recorder as error_recorder
+from core.middleware import HTMLGZipMiddleware
+from core.models import ErrorStat, ProfileReport, QueryStat, StoredFile, Task
+from core.profiling import PROFILE_MODE_PARAM, PROFILE_PARAM, make_token
+from core.query_stats import normalize, recorder
+from core.sessions import BENCHMARK_ENGINES
+from core.storage import ContentAddressedFileSystemStorage
+from core.task_queue import (
+    claim, enqueue, prune_finished, requeue_stale, time_out
+)
+from core.views import static_asset
+from posts.models import Post
+from users.cache import invalidate_user
+
+TEMP_STATIC_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_PRERENDERED_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
 
 class ViewTestClass(TestCase):
     def test_error_page(self):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class ErrorPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(NOT_FOUND_RATE_LIMIT=2)
+    def test_repeated_not_found_is_limited(self):
+        """Частые 404 от одного клиента получают 429."""
+        statuses = [
+            self.client.get(f'/nonexist-{number}/').status_code
+            for number in range(3)
+        ]
+        self.assertEqual(statuses, [
+            HTTPStatus.NOT_FOUND,
+            HTTPStatus.NOT_FOUND,
+            HTTPStatus.TOO_MANY_REQUESTS,
+        ])
+        self.assertEqual(
+            self.client.get(
+                '/nonexist-page/',
+                REMOTE_ADDR='10.0.0.1'
+            ).status_code,
+            HTTPStatus.NOT_FOUND
+        )
+
+    @override_settings(NOT_FOUND_RATE_LIMIT=1, TRUSTED_PROXIES=1)
+    def test_clients_behind_proxy_are_limited_separately(self):
+        """За прокси лимит считается по адресу клиента, а не прокси."""
+        def get(client_ip):
+            return self.client.get(
+                '/nonexist-page/',
+                REMOTE_ADDR='10.0.0.1',
+                HTTP_X_FORWARDED_FOR=f'1.1.1.1, {client_ip}'
+            ).status_code
+
+        self.assertEqual(get('203.0.113.1'), HTTPStatus.NOT_FOUND)
+        self.assertEqual(get('203.0.113.2'), HTTPStatus.NOT_FOUND)
+        self.assertEqual(get('203.0.113.1'), HTTPStatus.TOO_MANY_REQUESTS)
+
+    def test_errors_are_counted_per_path(self):
+        """Ошибки считаются по адресам."""
+        for _ in range(2):
+            self.client.get('/counted-page/')
+        error_recorder.flush()
+        self.assertEqual(
+            ErrorStat.objects.get(
+                path='/counted-page/',
+                status_code=HTTPStatus.NOT_FOUND
+            ).count,
+            2
+        )
+
+
+class HTMLGZipMiddlewareTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.middleware = HTMLGZipMiddleware()
+
+    def test_large_html_is_compressed(self):
+        """Большая HTML-страница сжимается."""
+        response = HttpResponse('<p>пост</p>' * settings.GZIP_MIN_LENGTH)
+        response = self.middleware.process_response(self.request, response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_small_and_non_html_are_not_compressed(self):
+        """Маленькие страницы и не-HTML ответы не сжимаются."""
+        responses = (
+            HttpResponse('<p>пост</p>'),
+            HttpResponse(
+                '{}' * settings.GZIP_MIN_LENGTH,
+                content_type='application/json'
+            ),
+        )
+        for response in responses:
+            with self.subTest(content_type=response['Content-Type']):
+                response = self.middleware.process_response(
+                    self.request,
+                    response
+                )
+                self.assertFalse(response.has_header('Content-Encoding'))
+
+
+@override_settings(
+    STATICFILES_DIRS=[TEMP_STATIC_DIR],
+    STATIC_ROOT=TEMP_STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage'
+)
+class CompressedStaticTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_STATIC_DIR, 'css'))
+        with open(os.path.join(TEMP_STATIC_DIR, 'css', 'site.css'), 'w') as f:
+            f.write('body { color: black; }\n' * 100)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_DIR, ignore_errors=True)
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def hashed_name(self):
+        names = os.listdir(os.path.join(TEMP_STATIC_ROOT, 'css'))
+        return next(
+            name for name in names
+            if name != 'site.css' and name.endswith('.css')
+        )
+
+    def test_collectstatic_builds_gzip_variant(self):
+        """collectstatic кладёт сжатую копию рядом с хешированным файлом."""
+        path = os.path.join(TEMP_STATIC_ROOT, 'css', self.hashed_name())
+        with open(path, 'rb') as original, open(path + '.gz', 'rb') as packed:
+            self.assertEqual(gzip.decompress(packed.read()), original.read())
+
+    def test_static_asset_serves_compressed_with_cache_headers(self):
+        """Статика отдаётся сжатой и с долгим кешированием."""
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = static_asset(request, 'css/' + self.hashed_name())
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn(
+            f'max-age={settings.STATIC_MAX_AGE}',
+            response['Cache-Control']
+        )
+        response.close()
+
+    def test_original_name_is_revalidated(self):
+        """Файл без хеша в имени не кешируется навсегда."""
+        request = RequestFactory().get('/')
+        response = static_asset(request, 'css/site.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        response.close()
+
+    def test_refused_encoding_is_not_used(self):
+        """Кодировка с q=0 не используется."""
+        request = RequestFactory().get(
+            '/',
+            HTTP_ACCEPT_ENCODING='gzip;q=0, identity'
+        )
+        response = static_asset(request, 'css/' + self.hashed_name())
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response.close()
+
+
+class TaskQueueTests(TestCase):
+    def run_worker(self):
+        call_command('run_worker', processes=0, once=True, stdout=StringIO())
+
+    def test_password_reset_email_is_queued(self):
+        """Письмо сброса пароля отправляется воркером, а не в запросе."""
+        get_user_model().objects.create_user(
+            username='user',
+            email='user@example.com',
+            password='password'
+        )
+        self.client.post(
+            reverse('users:password_reset_form'),
+            {'email': 'user@example.com'}
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Task.objects.get().status, Task.PENDING)
+        self.run_worker()
+        self.assertEqual(len(mail.outbox), 1)
+        queued = Task.objects.get()
+        self.assertEqual(queued.status, Task.DONE)
+        self.assertIsNotNone(queued.duration)
+
+    def test_failed_task_is_retried_then_marked_failed(self):
+        """Упавшая задача повторяется до исчерпания попыток."""
+        queued = enqueue('core.tests.missing_task', max_attempts=2)
+        self.run_worker()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertEqual(queued.attempts, 1)
+        Task.objects.update(run_after=queued.created)
+        self.run_worker()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertIn('KeyError', queued.error)
+
+    def test_claim_sets_owner_and_counts_attempt(self):
+        """Взятая задача помечается воркером, попытка засчитывается."""
+        queued = enqueue('core.tasks.prune_tasks')
+        self.assertEqual(claim(5, 'worker-1'), [queued.id])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.RUNNING)
+        self.assertEqual(queued.owner, 'worker-1')
+        self.assertEqual(queued.attempts, 1)
+        self.assertEqual(claim(5, 'worker-2'), [])
+
+    def test_stale_tasks_are_requeued_or_failed(self):
+        """Задачи упавших воркеров возвращаются в очередь до исчерпания
+        попыток, а выполняющиеся в срок не трогаются."""
+        expired = enqueue('core.tasks.prune_tasks', max_attempts=2)
+        exhausted = enqueue('core.tasks.prune_tasks', max_attempts=1)
+        running = enqueue('core.tasks.prune_tasks')
+        claim(3, 'worker-1')
+        Task.objects.exclude(id=running.id).update(
+            started=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(requeue_stale(timeout=60), 1)
+        expired.refresh_from_db()
+        exhausted.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(expired.status, Task.PENDING)
+        self.assertEqual(expired.owner, '')
+        self.assertEqual(exhausted.status, Task.FAILED)
+        self.assertEqual(running.status, Task.RUNNING)
+
+    def test_timed_out_task_is_retried(self):
+        """Задача, не уложившаяся в TASK_TIMEOUT, откладывается на повтор."""
+        queued = enqueue('core.tasks.prune_tasks')
+        claim(1, 'worker-1')
+        self.assertEqual(time_out(queued.id, timeout=5), Task.PENDING)
+        queued.refresh_from_db()
+        self.assertIn('5 с', queued.error)
+        self.assertGreater(queued.run_after, timezone.now())
+
+    def test_finished_tasks_are_pruned(self):
+        """Старые выполненные и упавшие задачи удаляются, остальные нет."""
+        old = timezone.now() - timedelta(days=30)
+        done = enqueue('core.tasks.prune_tasks')
+        failed = enqueue('core.tasks.prune_tasks')
+        recent = enqueue('core.tasks.prune_tasks')
+        pending = enqueue('core.tasks.prune_tasks')
+        Task.objects.filter(id=done.id).update(status=Task.DONE, finished=old)
+        Task.objects.filter(id=failed.id).update(
+            status=Task.FAILED,
+            finished=old
+        )
+        Task.objects.filter(id=recent.id).update(
+            status=Task.DONE,
+            finished=timezone.now()
+        )
+        self.assertEqual(prune_finished(days=7, batch_size=1), 2)
+        self.assertEqual(
+            set(Task.objects.values_list('id', flat=True)),
+            {recent.id, pending.id}
+        )
+
+
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = get_user_model().objects.create_user(
+            username='staff',
+            is_staff=True
+        )
+        cls.user = get_user_model().objects.create_user(username='user')
+
+    def setUp(self):
+        self.staff_client = self.client_class()
+        self.staff_client.force_login(self.staff)
+
+    def test_profiled_request_stores_report(self):
+        """Запрос с токеном сотрудника сохраняет отчёт профайлера."""
+        for mode in (ProfileReport.CPROFILE, ProfileReport.SAMPLE):
+            with self.subTest(mode=mode):
+                response = self.staff_client.get('/', {
+                    PROFILE_PARAM: make_token(ProfilingTests.staff),
+                    PROFILE_MODE_PARAM: mode,
+                })
+                report = ProfileReport.objects.get(
+                    pk=response['X-Profile-Report']
+                )
+                self.assertEqual(report.mode, mode)
+                self.assertEqual(report.status_code, HTTPStatus.OK)
+                self.assertTrue(json.loads(report.sql))
+                self.assertIn(
+                    'posts/index.html',
+                    [row['name'] for row in json.loads(report.templates)]
+                )
+                if mode == ProfileReport.CPROFILE:
+                    self.assertIn('cumulative', report.stats)
+
+    def test_foreign_token_is_ignored(self):
+        """Токен не включает профилирование для другого пользователя."""
+        client = self.client_class()
+        client.force_login(ProfilingTests.user)
+        response = client.get(
+            '/',
+            HTTP_X_PROFILE=make_token(ProfilingTests.staff)
+        )
+        self.assertFalse(response.has_header('X-Profile-Report'))
+        self.assertFalse(ProfileReport.objects.exists())
+
+
+class QueryStatsTests(TestCase):
+    def test_normalize_groups_similar_queries(self):
+        """Запросы с разными литералами дают один отпечаток."""
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE id IN (1, 2, 3) AND s = 'a'"),
+            normalize("SELECT *  FROM t WHERE id IN (7) AND s = 'bb'")
+        )
+
+    def test_stats_are_collected_per_view(self):
+        """Запросы страницы попадают в статистику её view."""
+        recorder.flush()
+        self.client.get('/')
+        recorder.flush()
+        self.assertTrue(
+            QueryStat.objects.filter(view='posts:index', count__gt=0).exists()
+        )
+        output = StringIO()
+        call_command('top_queries', view='posts:index', stdout=output)
+        self.assertIn('posts_post', output.getvalue())
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    def test_slow_queries_are_logged_with_caller(self):
+        """Медленные запросы пишутся в журнал с местом вызова."""
+        with self.assertLogs('yatube.slow_queries', 'WARNING') as logs:
+            self.client.get('/')
+        self.assertTrue(any('posts/views.py' in line for line in logs.output))
+
+
+@override_settings(PRERENDERED_ROOT=TEMP_PRERENDERED_ROOT)
+class PrerenderTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('prerender_pages', stdout=StringIO())
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PRERENDERED_ROOT, ignore_errors=True)
+        prerender._pages.clear()
+
+    def test_pages_are_written(self):
+        """Страницы about и ошибок записываются в файлы."""
+        for template_name in prerender.PRERENDERED_PAGES:
+            with self.subTest(template_name=template_name):
+                self.assertTrue(
+                    os.path.isfile(prerender.page_path(template_name))
+                )
+
+    def test_anonymous_gets_prerendered_page(self):
+        """Анонимный посетитель получает страницу из памяти."""
+        response = self.client.get(reverse('about:author'))
+        self.assertEqual(
+            response.content.decode(),
+            prerender.fill(prerender.get_page('about/author.html'))
+        )
+        self.assertIn('max-age', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        self.assertTemplateNotUsed(response, 'about/author.html')
+
+    def test_year_is_filled_when_served(self):
+        """Год в подвале подставляется при отдаче, а не при рендере."""
+        self.assertIn(
+            prerender.YEAR_PLACEHOLDER,
+            prerender.get_page('about/author.html')
+        )
+        response = self.client.get(reverse('about:author'))
+        self.assertContains(response, f'© {timezone.now().year} Copyright')
+
+    def test_missing_page_is_not_remembered(self):
+        """Страница, отрендеренная после первого обращения, подхватывается."""
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        with self.settings(PRERENDERED_ROOT=root):
+            self.assertIsNone(prerender.get_page('about/tech.html'))
+            os.makedirs(os.path.join(root, 'about'))
+            with open(prerender.page_path('about/tech.html'), 'w') as page:
+                page.write('готово')
+            self.assertEqual(prerender.get_page('about/tech.html'), 'готово')
+
+    def test_authorized_user_gets_rendered_page(self):
+        """Авторизованный пользователь получает обычный рендер."""
+        self.client.force_login(
+            get_user_model().objects.create_user(username='user')
+        )
+        response = self.client.get(reverse('about:author'))
+        self.assertTemplateUsed(response, 'about/author.html')
+
+    def test_not_found_uses_prerendered_page(self):
+        """404 отдаётся из памяти без загрузки сессии и пользователя."""
+        self.client.force_login(
+            get_user_model().objects.create_user(username='user')
+        )
+        with self.assertNumQueries(0):
+            response = self.client.get('/<nonexist>/')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertTemplateNotUsed(response, 'core/404.html')
+        self.assertContains(
+            response,
+            '/&lt;nonexist&gt;/',
+            status_code=HTTPStatus.NOT_FOUND
+        )
+
+
+class SessionTests(TestCase):
+    def test_expired_sessions_are_cleared_in_batches(self):
+        """Истёкшие сессии удаляются пачками, живые остаются."""
+        now = timezone.now()
+        Session.objects.bulk_create([
+            Session(
+                session_key=f'expired{number}',
+                session_data='',
+                expire_date=now - timedelta(days=1)
+            )
+            for number in range(3)
+        ] + [
+            Session(
+                session_key='alive',
+                session_data='',
+                expire_date=now + timedelta(days=1)
+            )
+        ])
+        out = StringIO()
+        call_command('clear_expired_sessions', batch_size=2, stdout=out)
+        self.assertIn('3', out.getvalue())
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['alive']
+        )
+
+    def test_benchmark_reports_every_engine(self):
+        """Бенчмарк выводит строку для каждого движка сессий."""
+        out = StringIO()
+        call_command('session_benchmark', iterations=3, stdout=out)
+        for engine in BENCHMARK_ENGINES:
+            with self.subTest(engine=engine):
+                self.assertIn(engine, out.getvalue())
+        self.assertFalse(Session.objects.exists())
+
+
+class LightUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='user',
+            first_name='Лев',
+            last_name='Толстой',
+            password='password'
+        )
+        self.client.login(username='user', password='password')
+        self.client.get(reverse('about:author'))
+
+    def test_user_is_served_from_cache(self):
+        """Повторный запрос не обращается к базе ни за сессией,
+        ни за пользователем."""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('about:author'))
+        self.assertEqual(
+            response.context['user'].get_full_name(),
+            'Лев Толстой'
+        )
+
+    def test_user_change_is_seen_immediately(self):
+        """Изменение пользователя сразу видно в следующем запросе."""
+        self.user.first_name = 'Фёдор'
+        self.user.save()
+        response = self.client.get(reverse('about:author'))
+        self.assertEqual(response.context['user'].first_name, 'Фёдор')
+
+    def test_deactivation_logs_out(self):
+        """Блокировка через save действует сразу."""
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_update_needs_explicit_invalidation(self):
+        """После update без сигналов запись сбрасывается invalidate_user."""
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+        invalidate_user(self.user.pk)
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_password_change_logs_out_other_sessions(self):
+        """После смены пароля старая сессия больше не действует."""
+        self.user.set_password('new-password')
+        self.user.save()
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ContentAddressedStorageTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.storage = ContentAddressedFileSystemStorage()
+
+    def test_identical_uploads_are_stored_once(self):
+        """Одинаковые файлы хранятся один раз в каталогах по хешу."""
+        first = self.storage.save('posts/a.gif', ContentFile(b'gif-data'))
+        second = self.storage.save('posts/b.GIF', ContentFile(b'gif-data'))
+        digest = hashlib.sha256(b'gif-data').hexdigest()
+        self.assertEqual(first, second)
+        self.assertEqual(
+            first,
+            f'posts/{digest[:2]}/{digest[2:4]}/{digest}.gif'
+        )
+        self.assertEqual(StoredFile.objects.get(name=first).refcount, 2)
+
+    def test_file_is_deleted_with_last_reference(self):
+        """Файл удаляется только вместе с последней ссылкой."""
+        name = self.storage.save('posts/a.gif', ContentFile(b'other'))
+        self.storage.save('posts/b.gif', ContentFile(b'other'))
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+
+    def test_replaced_post_image_is_released(self):
+        """Замена картинки поста снимает ссылку на старый файл."""
+        post = Post.objects.create(
+            author=get_user_model().objects.create_user(username='user'),
+            text='Тестовый пост',
+            image=SimpleUploadedFile('a.gif', b'first', 'image/gif')
+        )
+        old_name = post.image.name
+        post = Post.objects.get(pk=post.pk)
+        post.image = SimpleUploadedFile('b.gif', b'second', 'image/gif')
+        post.save()
+        self.assertFalse(self.storage.exists(old_name))
+        post.delete()
+        self.assertFalse(StoredFile.objects.exists())
@@ -1,13 +1,89 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.html import escape
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from django.views.generic.base import TemplateView
+
+from .context_processors.year import year
+from .error_stats import recorder
+from .prerender import fill, get_page
+
+STATIC_ENCODINGS = (
+    ('br', '.br'),
+    ('gzip', '.gz'),
+)
+HASHED_NAME_RE = re.compile(r'^(?P<name>.+)\.[0-9a-f]{12}(?P<ext>\.[^/.]+)$')
+
+
+def error_page(request, template_name, status):
+    """Страница ошибки без сессии, пользователя и контекст-процессоров.
+
+    Тело берётся из заранее отрендеренной страницы в памяти,
+    а без неё шаблон рендерится без запроса.
+    """
+    recorder.record(request.path, status)
+    html = get_page(template_name)
+    if html is None:
+        html = render_to_string(
+            template_name,
+            {'path': request.path, **year(None)}
+        )
+    else:
+        html = fill(html, escape(request.path))
+    return HttpResponse(html, status=status)
+
+
+def client_ip(request):
+    """Адрес клиента с учётом TRUSTED_PROXIES прокси перед сайтом.
+
+    Каждый прокси дописывает адрес в конец X-Forwarded-For, поэтому
+    берётся адрес, добавленный самым дальним из доверенных прокси.
+    """
+    proxies = settings.TRUSTED_PROXIES
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    addresses = [
+        address.strip() for address in forwarded.split(',') if address.strip()
+    ]
+    if proxies and addresses:
+        return addresses[-min(proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR')
+
+
+def not_found_limited(request):
+    """Учитывает 404 клиента в текущем окне лимита."""
+    key = f'404:rate:{client_ip(request)}'
+    window = settings.NOT_FOUND_RATE_WINDOW
+    cache.add(key, 0, window)
+    try:
+        used = cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, window)
+        used = 1
+    return used > settings.NOT_FOUND_RATE_LIMIT
 
 
 def page_not_found(request, exception):
-    return render(
-        request,
-        'core/404.html',
-        {'path': request.path},
-        status=404
-    )
+    if not_found_limited(request):
+        recorder.record(request.path, 429)
+        response = HttpResponse(
+            'Слишком много запросов',
+            content_type='text/plain; charset=utf-8',
+            status=429
+        )
+        response['Retry-After'] = settings.NOT_FOUND_RATE_WINDOW
+        return response
+    return error_page(request, 'core/404.html', 404)
 
 
 def csrf_failure(request, reason=''):
@@ -15,18 +91,104 @@ def csrf_failure(request, reason=''):
 
 
 def forbidden(request, exception):
-    return render(
-        request,
-        'core/403.html',
-        {'path': request.path},
-        status=403
-    )
+    return error_page(request, 'core/403.html', 403)
 
 
 def internal_server_error(request, *args, **argv):
-    return render(
-        request,
-        'core/500.html',
-        {'path': request.path},
-        status=500
-    )
+    return error_page(request, 'core/500.html', 500)
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding с их весами q."""
+    weights = {}
+    for part in header.split(','):
+        name, *params = [item.strip() for item in part.split(';')]
+        if not name:
+            continue
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.lower()] = weight
+    return weights
+
+
+def is_hashed(path):
+    """Имя из манифеста хешированной статики: его содержимое не меняется."""
+    match = HASHED_NAME_RE.match(path)
+    if match is None:
+        return False
+    original = match.group('name') + match.group('ext')
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+    return hashed_files.get(original) == path
+
+
+def static_asset(request, path):
+    """Отдаёт статику со сжатым вариантом.
+
+    Долгое кеширование с immutable получают только хешированные
+    имена из манифеста, остальные файлы браузер перепроверяет.
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404
+    weights = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    encoding = None
+    for name, suffix in STATIC_ENCODINGS:
+        if weights.get(name, weights.get('*', 0)) > 0 and os.path.isfile(
+            full_path + suffix
+        ):
+            encoding = name
+            full_path += suffix
+            break
+    if not os.path.isfile(full_path):
+        raise Http404
+    modified = os.stat(full_path).st_mtime
+    if not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'),
+        modified
+    ):
+        response = HttpResponse(status=304)
+    else:
+        content_type, _ = mimetypes.guess_type(path)
+        response = FileResponse(
+            open(full_path, 'rb'),
+            content_type=content_type or 'application/octet-stream'
+        )
+        response['Last-Modified'] = http_date(modified)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if is_hashed(path):
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.STATIC_MAX_AGE,
+            immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+class PrerenderedTemplateView(TemplateView):
+    """Отдаёт анонимным посетителям заранее отрендеренную страницу."""
+
+    def get(self, request, *args, **kwargs):
+        if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+            html = get_page(self.template_name)
+            if html is not None:
+                response = HttpResponse(fill(html))
+                patch_cache_control(
+                    response,
+                    public=True,
+                    max_age=settings.PRERENDERED_MAX_AGE
+                )
+                patch_vary_headers(response, ['Cookie'])
+                return response
+        return super().get(request, *args, **kwargs)
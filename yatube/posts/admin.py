@@ -1,6 +1,36 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import ValidationError
 
-from .models import Group, Post, Comment
+from .models import ArchivedPost, Group, ImageRendition, Post, Comment
+from .moderation import set_comments_deleted, set_posts_deleted
+from .regroup import merge_groups, move_posts
+
+
+class GroupActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        queryset=Group.objects.all(),
+        required=False,
+        label='Группа'
+    )
+
+
+def target_group(modeladmin, request):
+    """Группа, выбранная в форме действия, или None с предупреждением."""
+    try:
+        group = GroupActionForm.base_fields['group'].clean(
+            request.POST.get('group')
+        )
+    except ValidationError:
+        group = None
+    if group is None:
+        modeladmin.message_user(
+            request,
+            'Выберите группу в списке рядом с действием',
+            level=messages.WARNING
+        )
+    return group
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -13,10 +43,122 @@ class PostAdmin(admin.ModelAdmin):
     )
     list_editable = ('group',)
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_filter = ('pub_date', 'is_deleted')
     empty_value_display = '-пусто-'
+    actions = ('hide', 'restore', 'move_to_group')
+    action_form = GroupActionForm
+
+    def get_queryset(self, request):
+        return Post.all_objects.select_related('author', 'group')
+
+    def move_to_group(self, request, queryset):
+        target = target_group(self, request)
+        if target is None:
+            return
+        updated = move_posts(queryset, target)
+        self.message_user(
+            request,
+            f'Перенесено постов в группу «{target}»: {updated}'
+        )
+    move_to_group.short_description = 'Перенести в выбранную группу'
+
+    def hide(self, request, queryset):
+        updated = set_posts_deleted(queryset, True)
+        self.message_user(request, f'Скрыто постов: {updated}')
+    hide.short_description = 'Скрыть выбранные посты'
+
+    def restore(self, request, queryset):
+        updated = set_posts_deleted(queryset, False)
+        self.message_user(request, f'Восстановлено постов: {updated}')
+    restore.short_description = 'Восстановить выбранные посты'
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
-admin.site.register(Comment)
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+    empty_value_display = '-пусто-'
+    actions = ('merge_into_group',)
+    action_form = GroupActionForm
+
+    def merge_into_group(self, request, queryset):
+        target = target_group(self, request)
+        if target is None:
+            return
+        moved = merge_groups(queryset, target)
+        self.message_user(
+            request,
+            f'Группы объединены в «{target}», перенесено постов: {moved}'
+        )
+    merge_into_group.short_description = (
+        'Объединить выбранные группы с группой из списка'
+    )
+
+
+admin.site.register(Group, GroupAdmin)
+
+
+class CommentAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'text',
+        'created',
+        'author',
+        'post',
+        'is_deleted',
+    )
+    search_fields = ('text',)
+    list_filter = ('created', 'is_deleted')
+    empty_value_display = '-пусто-'
+    actions = ('hide', 'restore')
+
+    def get_queryset(self, request):
+        return Comment.all_objects.select_related('author', 'post')
+
+    def hide(self, request, queryset):
+        updated = set_comments_deleted(queryset, True)
+        self.message_user(request, f'Скрыто комментариев: {updated}')
+    hide.short_description = 'Скрыть выбранные комментарии'
+
+    def restore(self, request, queryset):
+        updated = set_comments_deleted(queryset, False)
+        self.message_user(request, f'Восстановлено комментариев: {updated}')
+    restore.short_description = 'Восстановить выбранные комментарии'
+
+
+admin.site.register(Comment, CommentAdmin)
+
+
+class ArchivedPostAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'text',
+        'pub_date',
+        'author',
+        'group',
+        'archived',
+    )
+    search_fields = ('text',)
+    list_filter = ('pub_date',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(ArchivedPost, ArchivedPostAdmin)
+
+
+class ImageRenditionAdmin(admin.ModelAdmin):
+    list_display = (
+        'source',
+        'format',
+        'width',
+        'height',
+        'url',
+    )
+    search_fields = ('source',)
+    list_filter = ('format', 'width')
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(ImageRendition, ImageRenditionAdmin)
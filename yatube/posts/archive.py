@@ -0,0 +1,68 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .group_stats import refresh_group_stats
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+ARCHIVE_BATCH: int = 500
+ARCHIVE_PAUSE: float = 0.5
+
+POST_FIELDS = ('id', 'text', 'pub_date', 'author_id', 'group_id', 'image')
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+def archive_batch(cutoff, batch_size=ARCHIVE_BATCH):
+    """Переносит в архив одну пачку постов старше cutoff с комментариями.
+
+    Копирование и удаление идут в одной короткой транзакции;
+    удаление минует сигналы, а агрегаты групп пересчитываются
+    один раз на пачку. Ссылку на картинку в StoredFile забирает
+    архивный пост, поэтому счётчик не меняется. Скрытые комментарии
+    в архив не попадают и удаляются вместе с постом.
+    """
+    ids = list(
+        Post.objects.filter(pub_date__lt=cutoff).order_by(
+            'id'
+        ).values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0
+    with transaction.atomic():
+        posts = Post.objects.filter(id__in=ids)
+        rows = [
+            dict(zip(POST_FIELDS, row))
+            for row in posts.values_list(*POST_FIELDS)
+        ]
+        ArchivedPost.objects.bulk_create(
+            [ArchivedPost(**row) for row in rows]
+        )
+        comments = Comment.all_objects.filter(post_id__in=ids)
+        ArchivedComment.objects.bulk_create([
+            ArchivedComment(**dict(zip(COMMENT_FIELDS, row)))
+            for row in comments.filter(is_deleted=False).values_list(
+                *COMMENT_FIELDS
+            )
+        ])
+        comments._raw_delete(comments.db)
+        posts._raw_delete(posts.db)
+    refresh_group_stats({row['group_id'] for row in rows})
+    return len(ids)
+
+
+def archive_old_posts(days=None, batch_size=ARCHIVE_BATCH,
+                      pause=ARCHIVE_PAUSE):
+    """Архивирует посты старше days дней пачками с паузами между ними."""
+    days = days or settings.ARCHIVE_AFTER_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+    archived = 0
+    while True:
+        count = archive_batch(cutoff, batch_size)
+        archived += count
+        if count < batch_size:
+            return archived
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,190 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter, namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Follow
+
+FOLLOW_GRAPH_TTL: int = 24 * 60 * 60
+GRAPH_QUERY_BATCH: int = 500
+SUGGESTIONS_BATCH: int = 500
+SUGGESTIONS_LIMIT: int = 10
+SUGGESTIONS_TTL: int = 2 * 24 * 60 * 60
+
+FOLLOWING: str = 'following'
+FOLLOWERS: str = 'followers'
+COLUMNS = {
+    FOLLOWING: ('user_id', 'author_id'),
+    FOLLOWERS: ('author_id', 'user_id'),
+}
+
+Suggestion = namedtuple('Suggestion', ('author_id', 'overlap'))
+
+
+def graph_key(direction, user_id):
+    return f'follows:{direction}:{user_id}'
+
+
+def count_key(direction, user_id):
+    return f'follows:count:{direction}:{user_id}'
+
+
+def suggestions_key(user_id):
+    return f'follows:suggestions:{user_id}'
+
+
+def unpack(data):
+    ids = array('I')
+    ids.frombytes(data)
+    return ids
+
+
+def contains(ids, value):
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+def load_many(direction, user_ids):
+    """Отсортированные массивы соседей пользователей из кеша.
+
+    Недостающие списки подгружаются из базы пачками
+    по GRAPH_QUERY_BATCH пользователей и кладутся в кеш.
+    """
+    user_ids = list(set(user_ids))
+    keys = {graph_key(direction, user_id): user_id for user_id in user_ids}
+    result = {
+        keys[key]: unpack(data)
+        for key, data in cache.get_many(keys).items()
+    }
+    missing = [user_id for user_id in user_ids if user_id not in result]
+    source, target = COLUMNS[direction]
+    for start in range(0, len(missing), GRAPH_QUERY_BATCH):
+        batch = missing[start:start + GRAPH_QUERY_BATCH]
+        loaded = {user_id: array('I') for user_id in batch}
+        rows = Follow.objects.filter(
+            **{f'{source}__in': batch}
+        ).order_by(source, target).values_list(source, target)
+        for user_id, neighbour_id in rows:
+            loaded[user_id].append(neighbour_id)
+        cache.set_many(
+            {
+                graph_key(direction, user_id): ids.tobytes()
+                for user_id, ids in loaded.items()
+            },
+            FOLLOW_GRAPH_TTL
+        )
+        result.update(loaded)
+    return result
+
+
+def following_ids(user_id):
+    return load_many(FOLLOWING, [user_id])[user_id]
+
+
+def follower_ids(user_id):
+    return load_many(FOLLOWERS, [user_id])[user_id]
+
+
+def is_following(user_id, author_id):
+    return contains(following_ids(user_id), author_id)
+
+
+def mutual_ids(user_id):
+    """Пользователи, подписанные друг на друга с user_id."""
+    small, large = sorted(
+        (following_ids(user_id), follower_ids(user_id)),
+        key=len
+    )
+    return array('I', (value for value in small if contains(large, value)))
+
+
+def follow_counts(user_id):
+    """Число подписчиков и подписок пользователя из кеша."""
+    counts = []
+    keys = [count_key(FOLLOWERS, user_id), count_key(FOLLOWING, user_id)]
+    found = cache.get_many(keys)
+    for direction, key in zip((FOLLOWERS, FOLLOWING), keys):
+        if key not in found:
+            source, _ = COLUMNS[direction]
+            found[key] = Follow.objects.filter(**{source: user_id}).count()
+            cache.set(key, found[key], FOLLOW_GRAPH_TTL)
+        counts.append(found[key])
+    return tuple(counts)
+
+
+def forget_follow(user_id, author_id):
+    """Сбрасывает закешированные списки и счётчики обоих пользователей.
+
+    Кеш общий для всех процессов, поэтому списки не правятся на месте:
+    одновременные изменения из разных процессов затёрли бы друг друга.
+    Ключи удаляются сразу и ещё раз после коммита, чтобы чтение между
+    ними не закешировало состояние до подписки.
+    """
+    keys = [
+        graph_key(FOLLOWING, user_id),
+        graph_key(FOLLOWERS, author_id),
+        count_key(FOLLOWING, user_id),
+        count_key(FOLLOWERS, author_id),
+    ]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def rank_suggestions(user_id, following, adjacency):
+    """Друзья друзей, отсортированные по числу общих подписок."""
+    overlap = Counter()
+    for author_id in following:
+        overlap.update(adjacency.get(author_id, ()))
+    candidates = [
+        (-count, author_id) for author_id, count in overlap.items()
+        if author_id != user_id and not contains(following, author_id)
+    ]
+    candidates.sort()
+    return [
+        (author_id, -count)
+        for count, author_id in candidates[:SUGGESTIONS_LIMIT]
+    ]
+
+
+def rebuild_suggestions(batch_size=SUGGESTIONS_BATCH):
+    """Пересчитывает рекомендации для всех, у кого есть подписки."""
+    last_id = 0
+    built = 0
+    while True:
+        users = list(
+            Follow.objects.filter(user_id__gt=last_id).order_by(
+                'user_id'
+            ).values_list('user_id', flat=True).distinct()[:batch_size]
+        )
+        if not users:
+            return built
+        last_id = users[-1]
+        following = load_many(FOLLOWING, users)
+        adjacency = load_many(
+            FOLLOWING,
+            {author_id for ids in following.values() for author_id in ids}
+        )
+        cache.set_many(
+            {
+                suggestions_key(user_id): rank_suggestions(
+                    user_id,
+                    following[user_id],
+                    adjacency
+                )
+                for user_id in users
+            },
+            SUGGESTIONS_TTL
+        )
+        built += len(users)
+
+
+def suggestions(user_id):
+    """Рекомендации из последнего пересчёта без уже сделанных подписок."""
+    following = following_ids(user_id)
+    return [
+        Suggestion(*suggestion)
+        for suggestion in cache.get(suggestions_key(user_id), ())
+        if not contains(following, suggestion[0])
+    ]
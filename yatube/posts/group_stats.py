@@ -0,0 +1,61 @@
+from django.db.models import Count, Max
+
+from core.task_queue import enqueue
+
+from .models import Group, GroupStats, Post
+
+TOP_AUTHORS_LIMIT: int = 3
+
+
+def schedule_group_stats(group_ids):
+    """Ставит пересчёт агрегатов групп в очередь фоновых задач.
+
+    Задача создаётся в той же транзакции, что и изменение поста,
+    и не появится, если транзакция откатится.
+    """
+    group_ids = sorted(set(group_ids) - {None})
+    if group_ids:
+        enqueue('posts.tasks.refresh_group_stats', *group_ids)
+
+
+def refresh_group_stats(group_ids):
+    """Пересчитывает агрегаты только для переданных групп."""
+    group_ids = set(group_ids) - {None}
+    if not group_ids:
+        return
+    posts = Post.objects.filter(group_id__in=group_ids).order_by()
+    totals = {
+        row['group_id']: row
+        for row in posts.values('group_id').annotate(
+            count=Count('id'),
+            last=Max('pub_date')
+        )
+    }
+    top_authors = {group_id: [] for group_id in group_ids}
+    for row in posts.values('group_id', 'author__username').annotate(
+        count=Count('id')
+    ).order_by('group_id', '-count', 'author__username'):
+        authors = top_authors[row['group_id']]
+        if len(authors) < TOP_AUTHORS_LIMIT:
+            authors.append(row['author__username'])
+    existing = set(
+        Group.objects.filter(id__in=group_ids).values_list('id', flat=True)
+    )
+    for group_id in existing:
+        total = totals.get(group_id, {})
+        GroupStats.objects.update_or_create(
+            group_id=group_id,
+            defaults={
+                'posts_count': total.get('count', 0),
+                'last_pub_date': total.get('last'),
+                'top_authors': ', '.join(top_authors[group_id]),
+            }
+        )
+
+
+def rebuild_group_stats(batch_size=500):
+    """Пересчитывает агрегаты всех групп пачками."""
+    group_ids = list(Group.objects.values_list('id', flat=True))
+    for start in range(0, len(group_ids), batch_size):
+        refresh_group_stats(group_ids[start:start + batch_size])
+    return len(group_ids)
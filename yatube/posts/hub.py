@@ -0,0 +1,60 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+HUB_HISTORY: int = 50
+HUB_TTL: int = 10 * 60
+
+
+class CacheHub:
+    """Короткая история сообщений тем в общем кеше.
+
+    Новые комментарии не проталкиваются клиентам: страница
+    опрашивает api:comments_since, и запрос может попасть в любой
+    процесс, поэтому история лежит в кеше, а не в памяти процесса.
+    Опрос читает только счётчик темы и сами сообщения, база
+    данных при этом не используется.
+    """
+
+    def publish(self, topic, message):
+        counter = f'hub:{topic}'
+        cache.add(counter, 0, HUB_TTL)
+        sequence = cache.incr(counter)
+        cache.touch(counter, HUB_TTL)
+        cache.set(f'{counter}:{sequence}', message, HUB_TTL)
+        return sequence
+
+    def last(self, topic):
+        return cache.get(f'hub:{topic}', 0)
+
+    def since(self, topic, after):
+        """Сообщения темы новее after, не больше HUB_HISTORY."""
+        sequence = self.last(topic)
+        first = max(after + 1, sequence - HUB_HISTORY + 1)
+        keys = [f'hub:{topic}:{seq}' for seq in range(first, sequence + 1)]
+        messages = cache.get_many(keys)
+        return [
+            (seq, messages[key])
+            for seq, key in zip(range(first, sequence + 1), keys)
+            if key in messages
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_hub():
+    return import_string(settings.PUBSUB_HUB)()
+
+
+def comments_topic(post_id):
+    return f'post:{post_id}:comments'
+
+
+def publish_comment(comment):
+    get_hub().publish(comments_topic(comment.post_id), {
+        'id': comment.id,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+    })
@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import deque
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Post
+
+RECENT_POSTS_LIMIT: int = 200
+CATCH_UP_INTERVAL: float = 1.0
+VERSION_KEY: str = 'live:recent_posts:version'
+
+POST_VALUES = (
+    'id', 'text', 'pub_date', 'author__username', 'group__slug', 'image'
+)
+
+
+def compact(values):
+    post_id, text, pub_date, author, group, image = values
+    return {
+        'id': post_id,
+        'text': text,
+        'pub_date': pub_date,
+        'author': author,
+        'group': group,
+        'image': image or None,
+    }
+
+
+class RecentPosts:
+    """Кольцевой буфер последних постов в памяти процесса.
+
+    Буфер пополняется при сохранении постов в этом процессе,
+    а посты из других процессов подтягиваются одним запросом
+    не чаще раза в CATCH_UP_INTERVAL секунд, сколько бы клиентов
+    ни опрашивало ленту. covered_after и covered_since — граница,
+    новее которой в буфере есть все посты.
+    """
+
+    def __init__(self, size=RECENT_POSTS_LIMIT):
+        self.items = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.checked = 0.0
+        self.covered_after = 0
+        self.covered_since = None
+        self.dirty = set()
+        self.version = None
+
+    def reset(self):
+        with self.lock:
+            self.items.clear()
+            self.loaded = False
+            self.checked = 0.0
+            self.dirty.clear()
+
+    def invalidate(self):
+        """Перестраивает буферы всех процессов при ближайшей сверке.
+
+        Нужна после массовых изменений через UPDATE, которые
+        не отправляют сигналов. Версия меняется сразу и ещё раз
+        после коммита, чтобы сверка между ними не закрепила
+        старое состояние.
+        """
+        cache.set(VERSION_KEY, uuid4().hex, None)
+        transaction.on_commit(
+            lambda: cache.set(VERSION_KEY, uuid4().hex, None)
+        )
+        self.reset()
+
+    @property
+    def newest_id(self):
+        return self.items[-1]['id'] if self.items else 0
+
+    def append(self, item):
+        """Добавляет пост, сдвигая границу при вытеснении старого."""
+        if len(self.items) == self.items.maxlen:
+            oldest = self.items[0]
+            self.covered_after = oldest['id']
+            self.covered_since = oldest['pub_date']
+        self.items.append(item)
+
+    def replace(self, item):
+        for index, existing in enumerate(self.items):
+            if existing['id'] == item['id']:
+                self.items[index] = item
+                return True
+        return False
+
+    def catch_up(self):
+        if time.monotonic() - self.checked < CATCH_UP_INTERVAL:
+            return
+        version = cache.get(VERSION_KEY)
+        if version != self.version:
+            self.reset()
+            self.version = version
+        queryset = Post.objects.order_by('-id').values_list(*POST_VALUES)
+        dirty = set(self.dirty)
+        if self.loaded:
+            queryset = queryset.filter(
+                Q(id__gt=self.newest_id) | Q(id__in=dirty)
+            )
+        rows = [compact(row) for row in queryset[:self.items.maxlen]]
+        new = [item for item in rows if item['id'] > self.newest_id]
+        with self.lock:
+            if not self.loaded or len(new) == self.items.maxlen:
+                # Буфер пуст или отстал больше чем на свою длину:
+                # строим его заново по свежей выборке.
+                self.items.clear()
+                self.loaded = True
+                full = len(rows) == self.items.maxlen
+                self.covered_after = rows[-1]['id'] - 1 if full else 0
+                self.covered_since = rows[-1]['pub_date'] if full else None
+            for item in reversed(rows):
+                if item['id'] > self.newest_id:
+                    self.append(item)
+                else:
+                    self.replace(item)
+            hidden = dirty - {item['id'] for item in rows}
+            for existing in list(self.items):
+                if existing['id'] in hidden:
+                    self.items.remove(existing)
+            self.dirty -= dirty
+            self.checked = time.monotonic()
+
+    def push(self, post):
+        """Обновляет пост в буфере по значениям сохранённого экземпляра.
+
+        Вызывается после коммита. Если автор или группа не загружены
+        вместе с постом, пост перечитывается при ближайшей сверке
+        с базой, а не отдельными запросами.
+        """
+        item = None
+        if Post.author.is_cached(post) and (
+            not post.group_id
+            or Post.group.is_cached(post) and post.group.pk == post.group_id
+        ):
+            item = compact([
+                post.id, post.text, post.pub_date, post.author.username,
+                post.group.slug if post.group_id else None, post.image.name
+            ])
+        with self.lock:
+            if not self.loaded:
+                return
+            if item is None:
+                self.dirty.add(post.id)
+                self.checked = 0.0
+                return
+            if self.replace(item):
+                return
+            if post.id > self.newest_id:
+                self.append(item)
+
+    def remove(self, post_id):
+        with self.lock:
+            for existing in list(self.items):
+                if existing['id'] == post_id:
+                    self.items.remove(existing)
+
+    def since(self, after_id=0, after_time=None):
+        """Посты новее after_id или after_time.
+
+        Возвращает None, если граница старше той, с которой буфер
+        содержит все посты, и ответ нужно брать из базы.
+        """
+        self.catch_up()
+        with self.lock:
+            items = list(self.items)
+            covered_after = self.covered_after
+            covered_since = self.covered_since
+        if (
+            after_id and after_id < covered_after
+            or after_time and covered_since and after_time < covered_since
+        ):
+            return None
+        return [
+            item for item in items
+            if item['id'] > after_id
+            and (after_time is None or item['pub_date'] > after_time)
+        ]
+
+
+recent_posts = RecentPosts()
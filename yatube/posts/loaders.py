@@ -0,0 +1,56 @@
+from django.core.paginator import Paginator
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
+
+from .models import Follow, Post, User
+
+
+class CountedPaginator(Paginator):
+    """Пагинатор, которому заранее известно число объектов."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = count
+
+    @cached_property
+    def count(self):
+        return self.known_count
+
+
+def count_subquery(queryset, field):
+    """Подзапрос с количеством строк queryset для внешнего автора."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+                field
+            ).annotate(count=Count('id')).values('count'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def load_profile(request, username, per_page):
+    """Загружает автора со счётчиками и подпиской и первую страницу
+    его постов за два запроса."""
+    author = get_object_or_404(
+        User.objects.annotate(
+            posts_count=count_subquery(Post.objects, 'author'),
+            followers_count=count_subquery(Follow.objects, 'author'),
+            following_count=count_subquery(Follow.objects, 'user'),
+            is_followed=Exists(Follow.objects.filter(
+                user_id=request.user.id,
+                author=OuterRef('pk')
+            )),
+        ),
+        username=username
+    )
+    paginator = CountedPaginator(
+        author.posts.select_related('group'),
+        per_page,
+        author.posts_count
+    )
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return author, page_obj
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import ARCHIVE_BATCH, ARCHIVE_PAUSE, archive_old_posts
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты и комментарии в архивные таблицы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Возраст постов в днях, по умолчанию ARCHIVE_AFTER_DAYS.'
+        )
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH)
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=ARCHIVE_PAUSE,
+            help='Пауза между пачками в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_old_posts(
+            options['days'],
+            options['batch_size'],
+            options['pause']
+        )
+        self.stdout.write(f'В архив перенесено постов: {archived}')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts.follow_graph import SUGGESTIONS_BATCH, rebuild_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации авторов для подписчиков.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SUGGESTIONS_BATCH
+        )
+
+    def handle(self, *args, **options):
+        built = rebuild_suggestions(options['batch_size'])
+        self.stdout.write(f'Посчитаны рекомендации для {built} пользователей')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from posts.renditions import build_all_renditions
+
+
+class Command(BaseCommand):
+    help = 'Строит варианты картинок постов для srcset.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Перестроить и уже существующие варианты.'
+        )
+
+    def handle(self, *args, **options):
+        built, failed = build_all_renditions(options['force'])
+        self.stdout.write(
+            f'Построено вариантов: {built}, '
+            f'не удалось открыть картинок: {failed}'
+        )
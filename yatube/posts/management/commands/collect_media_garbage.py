@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from posts.media_gc import MEDIA_GC_BATCH, MEDIA_GC_PAUSE, collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы постов, на которые не ссылается ни один пост.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены.'
+        )
+        parser.add_argument('--batch-size', type=int, default=MEDIA_GC_BATCH)
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=MEDIA_GC_PAUSE,
+            help='Пауза между пачками в секундах.'
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            help='Возраст файлов в секундах, по умолчанию MEDIA_GC_MIN_AGE.'
+        )
+
+    def handle(self, *args, **options):
+        def show(orphan):
+            self.stdout.write(f'{orphan.name}\t{orphan.size}')
+
+        verbose = options['dry_run'] or options['verbosity'] > 1
+        report = collect_garbage(
+            options['dry_run'],
+            options['batch_size'],
+            options['pause'],
+            options['min_age'],
+            on_orphan=show if verbose else None
+        )
+        self.stdout.write(
+            f'Без ссылок файлов: {report.files}, '
+            f'байт: {report.size}, удалено: {report.deleted}, '
+            f'исправлено счётчиков: {report.refcounts}, '
+            f'устаревших вариантов картинок: {report.renditions}'
+        )
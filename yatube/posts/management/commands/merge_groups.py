@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import Group
+from posts.regroup import merge_groups
+
+
+class Command(BaseCommand):
+    help = 'Переносит посты групп-источников в целевую группу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('target', help='Адрес целевой группы.')
+        parser.add_argument(
+            'sources',
+            nargs='+',
+            help='Адреса групп-источников.'
+        )
+        parser.add_argument(
+            '--keep-sources',
+            action='store_true',
+            help='Только перенести посты, не удаляя группы-источники.'
+        )
+
+    def handle(self, *args, **options):
+        target = Group.objects.filter(slug=options['target']).first()
+        if target is None:
+            raise CommandError(f'Группа {options["target"]} не найдена')
+        sources = Group.objects.filter(slug__in=options['sources'])
+        missing = set(options['sources']) - set(
+            sources.values_list('slug', flat=True)
+        )
+        if missing:
+            raise CommandError(
+                f'Группы не найдены: {", ".join(sorted(missing))}'
+            )
+        moved = merge_groups(
+            sources,
+            target,
+            delete_sources=not options['keep_sources']
+        )
+        self.stdout.write(f'Перенесено постов: {moved}')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.moderation import PURGE_BATCH, PURGE_PAUSE, purge_deleted
+
+
+class Command(BaseCommand):
+    help = 'Окончательно удаляет скрытые посты и комментарии пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH)
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=PURGE_PAUSE,
+            help='Пауза между пачками в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        posts, comments = purge_deleted(
+            options['batch_size'],
+            options['pause']
+        )
+        self.stdout.write(
+            f'Удалено постов: {posts}, комментариев: {comments}'
+        )
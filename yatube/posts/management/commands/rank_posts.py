@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.ranking import rebuild_ranking
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг популярных постов.'
+
+    def handle(self, *args, **options):
+        ranking = rebuild_ranking()
+        self.stdout.write(f'Посчитан рейтинг {len(ranking)} постов')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.group_stats import rebuild_group_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает агрегаты каталога групп.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = rebuild_group_stats(options['batch_size'])
+        self.stdout.write(f'Обновлены агрегаты {count} групп')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.warming import WARM_PAGES, warm_cache
+
+
+class Command(BaseCommand):
+    help = 'Прогревает кеш первых страниц лент.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=WARM_PAGES)
+        parser.add_argument('--processes', type=int, default=2)
+
+    def handle(self, *args, **options):
+        results = warm_cache(options['pages'], options['processes'])
+        for url, status in results:
+            self.stdout.write(f'{status} {url}')
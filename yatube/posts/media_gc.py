@@ -0,0 +1,186 @@
+import posixpath
+import time
+from collections import Counter, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from sorl.thumbnail import default as thumbnail_default
+from sorl.thumbnail import delete as delete_thumbnails
+
+from core.models import StoredFile
+
+from .models import ArchivedPost, ImageRendition, Post
+from .renditions import RENDITION_DIRECTORY, drop_renditions
+
+MEDIA_GC_DIRECTORIES = ('posts', RENDITION_DIRECTORY)
+MEDIA_GC_BATCH: int = 500
+MEDIA_GC_PAUSE: float = 0.5
+
+Orphan = namedtuple('Orphan', 'name size')
+GarbageReport = namedtuple(
+    'GarbageReport', 'files size deleted refcounts renditions'
+)
+
+
+def iter_files(storage, directory):
+    """Обходит каталог хранилища по одному подкаталогу за раз."""
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for subdirectory in directories:
+        yield from iter_files(storage, posixpath.join(directory, subdirectory))
+
+
+def reference_counts():
+    """Сколько раз каждый файл упоминается в постах, архиве
+    и вариантах картинок."""
+    counts = Counter()
+    for manager in (Post.all_objects, ArchivedPost.objects):
+        counts.update(
+            manager.exclude(image='').values_list(
+                'image', flat=True
+            ).iterator()
+        )
+    counts.update(
+        ImageRendition.objects.values_list('name', flat=True).iterator()
+    )
+    return counts
+
+
+def referenced(names):
+    """Имена из names, на которые уже есть ссылки в базе."""
+    found = set()
+    for manager in (Post.all_objects, ArchivedPost.objects):
+        found.update(
+            manager.filter(image__in=names).values_list('image', flat=True)
+        )
+    found.update(
+        ImageRendition.objects.filter(name__in=names).values_list(
+            'name', flat=True
+        )
+    )
+    return found
+
+
+def stale_renditions(counts):
+    """Варианты картинок, исходники которых больше не используются."""
+    sources = set(
+        ImageRendition.objects.values_list('source', flat=True).distinct()
+    )
+    return ImageRendition.objects.filter(
+        source__in=[source for source in sources if not counts[source]]
+    )
+
+
+def orphan_cutoff(min_age=None):
+    """Файлы, изменённые позже этого времени, не считаются сиротами."""
+    if min_age is None:
+        min_age = settings.MEDIA_GC_MIN_AGE
+    return timezone.now() - timedelta(seconds=min_age)
+
+
+def find_orphans(counts, min_age=None, storage=None):
+    """Файлы постов без ссылок, пролежавшие дольше min_age секунд."""
+    storage = storage or default_storage
+    cutoff = orphan_cutoff(min_age)
+    for directory in MEDIA_GC_DIRECTORIES:
+        if not storage.exists(directory):
+            continue
+        for name in iter_files(storage, directory):
+            if counts[name] or storage.get_modified_time(name) > cutoff:
+                continue
+            yield Orphan(name, storage.size(name))
+
+
+def reconcile_refcounts(counts, dry_run=False):
+    """Приводит счётчики StoredFile к числу ссылок из базы.
+
+    Счётчик меняется, только если не изменился с момента чтения:
+    загрузка или удаление, прошедшие за это время, не затираются.
+    Записи без ссылок остаются сборщику вместе с файлами.
+    """
+    fixed = 0
+    for stored in StoredFile.objects.only('name', 'refcount').iterator():
+        actual = counts[stored.name]
+        if not actual or actual == stored.refcount:
+            continue
+        if dry_run:
+            fixed += 1
+            continue
+        fixed += StoredFile.objects.filter(
+            pk=stored.pk,
+            refcount=stored.refcount
+        ).update(refcount=actual)
+    return fixed
+
+
+def delete_batch(names, storage, cutoff):
+    """Удаляет файлы и их миниатюры, перепроверив ссылки перед этим.
+
+    Запись StoredFile блокируется до удаления, а время изменения
+    файла проверяется ещё раз: повторная загрузка того же файла
+    после поиска сирот обновляет его и файл остаётся.
+    """
+    alive = referenced(names)
+    discard = getattr(storage, 'discard', storage.delete)
+    deleted = []
+    for name in names:
+        if name in alive:
+            continue
+        with transaction.atomic():
+            StoredFile.objects.select_for_update().filter(
+                name=name
+            ).first()
+            if (
+                storage.exists(name)
+                and storage.get_modified_time(name) > cutoff
+            ):
+                continue
+            delete_thumbnails(name, delete_file=False)
+            discard(name)
+        deleted.append(name)
+    return deleted
+
+
+def collect_garbage(dry_run=False, batch_size=MEDIA_GC_BATCH,
+                    pause=MEDIA_GC_PAUSE, min_age=None, storage=None,
+                    on_orphan=None):
+    """Удаляет пачками файлы постов, на которые никто не ссылается.
+
+    Сначала снимаются варианты картинок, чьи исходники не используются.
+    С dry_run только считает файлы и их размер, ничего не меняя.
+    on_orphan вызывается для каждого найденного файла, например
+    для отчёта команды.
+    """
+    storage = storage or default_storage
+    stale = stale_renditions(reference_counts())
+    renditions = stale.count() if dry_run else drop_renditions(
+        stale,
+        storage
+    )
+    counts = reference_counts()
+    refcounts = reconcile_refcounts(counts, dry_run)
+    cutoff = orphan_cutoff(min_age)
+    files = size = deleted = 0
+    batch = []
+    for orphan in find_orphans(counts, min_age, storage):
+        if on_orphan is not None:
+            on_orphan(orphan)
+        files += 1
+        size += orphan.size
+        if dry_run:
+            continue
+        batch.append(orphan.name)
+        if len(batch) >= batch_size:
+            deleted += len(delete_batch(batch, storage, cutoff))
+            batch = []
+            if pause:
+                time.sleep(pause)
+    if batch:
+        deleted += len(delete_batch(batch, storage, cutoff))
+    if not dry_run:
+        thumbnail_default.kvstore.cleanup()
+    return GarbageReport(files, size, deleted, refcounts, renditions)
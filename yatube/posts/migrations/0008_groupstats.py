@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_follow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Группа')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='количество постов')),
+                ('last_pub_date', models.DateTimeField(blank=True, null=True, verbose_name='дата последнего поста')),
+                ('top_authors', models.CharField(blank=True, max_length=255, verbose_name='самые активные авторы')),
+            ],
+            options={
+                'ordering': ['-posts_count'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_name_in_room'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_groupstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['author', '-id'], name='follow_author_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['user', '-id'], name='follow_user_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='is_deleted',
+            field=models.BooleanField(default=False, verbose_name='скрыт'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_deleted',
+            field=models.BooleanField(default=False, verbose_name='скрыт'),
+        ),
+    ]
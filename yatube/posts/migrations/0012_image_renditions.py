@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageRendition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(db_index=True, max_length=255, verbose_name='исходный файл')),
+                ('format', models.CharField(max_length=10, verbose_name='формат')),
+                ('width', models.PositiveIntegerField(verbose_name='ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='высота')),
+                ('name', models.CharField(max_length=255, verbose_name='файл')),
+                ('url', models.CharField(max_length=500, verbose_name='адрес')),
+            ],
+            options={
+                'verbose_name': 'вариант картинки',
+                'verbose_name_plural': 'варианты картинок',
+                'ordering': ['source', 'format', 'width'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='imagerendition',
+            constraint=models.UniqueConstraint(fields=('source', 'format', 'width'), name='unique_rendition'),
+        ),
+    ]
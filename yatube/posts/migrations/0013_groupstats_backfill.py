@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:18
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+TOP_AUTHORS_LIMIT = 3
+
+
+def backfill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.filter(is_deleted=False).order_by()
+    totals = {
+        row['group_id']: row
+        for row in posts.values('group_id').annotate(
+            count=Count('id'),
+            last=Max('pub_date')
+        )
+    }
+    top_authors = {}
+    for row in posts.exclude(group_id=None).values(
+        'group_id', 'author__username'
+    ).annotate(count=Count('id')).order_by(
+        'group_id', '-count', 'author__username'
+    ):
+        authors = top_authors.setdefault(row['group_id'], [])
+        if len(authors) < TOP_AUTHORS_LIMIT:
+            authors.append(row['author__username'])
+    for group_id in Group.objects.values_list('id', flat=True):
+        total = totals.get(group_id, {})
+        GroupStats.objects.update_or_create(
+            group_id=group_id,
+            defaults={
+                'posts_count': total.get('count', 0),
+                'last_pub_date': total.get('last'),
+                'top_authors': ', '.join(top_authors.get(group_id, [])),
+            }
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='groupstats',
+            name='top_authors',
+            field=models.TextField(blank=True, verbose_name='самые активные авторы'),
+        ),
+        migrations.RunPython(
+            backfill_group_stats,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -21,6 +21,13 @@ class Group(models.Model):
         return self.title
 
 
+class VisibleManager(models.Manager):
+    """Менеджер без скрытых модератором объектов."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст поста'
@@ -48,6 +55,13 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    is_deleted = models.BooleanField(
+        verbose_name='скрыт',
+        default=False
+    )
+
+    objects = VisibleManager()
+    all_objects = models.Manager()
 
     def __str__(self) -> str:
         return self.text[:NUMBER_OF_LETTERS]
@@ -76,6 +90,13 @@ class Comment(models.Model):
         verbose_name='дата публикации',
         auto_now_add=True
     )
+    is_deleted = models.BooleanField(
+        verbose_name='скрыт',
+        default=False
+    )
+
+    objects = VisibleManager()
+    all_objects = models.Manager()
 
     def __str__(self) -> str:
         return self.text[:NUMBER_OF_LETTERS]
@@ -105,3 +126,155 @@ class Follow(models.Model):
                 name="unique_name_in_room"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['author', '-id'],
+                name='follow_author_id_idx'
+            ),
+            models.Index(
+                fields=['user', '-id'],
+                name='follow_user_id_idx'
+            ),
+        ]
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Группа'
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='количество постов',
+        default=0
+    )
+    last_pub_date = models.DateTimeField(
+        verbose_name='дата последнего поста',
+        blank=True,
+        null=True
+    )
+    top_authors = models.TextField(
+        verbose_name='самые активные авторы',
+        blank=True
+    )
+
+    def __str__(self) -> str:
+        return str(self.group)
+
+    class Meta:
+        ordering = ['-posts_count']
+
+
+class ArchivedPost(models.Model):
+    id = models.IntegerField(
+        primary_key=True,
+        verbose_name='ID'
+    )
+    text = models.TextField(
+        verbose_name='Текст поста'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='дата публикации'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа'
+    )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+    archived = models.DateTimeField(
+        verbose_name='дата архивации',
+        auto_now_add=True
+    )
+
+    def __str__(self) -> str:
+        return self.text[:NUMBER_OF_LETTERS]
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'архивный пост'
+        verbose_name_plural = 'архивные посты'
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(
+        primary_key=True,
+        verbose_name='ID'
+    )
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Текст поста'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор'
+    )
+    text = models.TextField(
+        verbose_name='Текст комментария'
+    )
+    created = models.DateTimeField(
+        verbose_name='дата публикации'
+    )
+
+    def __str__(self) -> str:
+        return self.text[:NUMBER_OF_LETTERS]
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'архивный комментарий'
+        verbose_name_plural = 'архивные комментарии'
+
+
+class ImageRendition(models.Model):
+    source = models.CharField(
+        verbose_name='исходный файл',
+        max_length=255,
+        db_index=True
+    )
+    format = models.CharField(
+        verbose_name='формат',
+        max_length=10
+    )
+    width = models.PositiveIntegerField(verbose_name='ширина')
+    height = models.PositiveIntegerField(verbose_name='высота')
+    name = models.CharField(
+        verbose_name='файл',
+        max_length=255
+    )
+    url = models.CharField(
+        verbose_name='адрес',
+        max_length=500
+    )
+
+    def __str__(self) -> str:
+        return f'{self.source} {self.width}x{self.height} {self.format}'
+
+    class Meta:
+        ordering = ['source', 'format', 'width']
+        constraints = [
+            models.UniqueConstraint(
+                fields=('source', 'format', 'width'),
+                name='unique_rendition'
+            )
+        ]
+        verbose_name = 'вариант картинки'
+        verbose_name_plural = 'варианты картинок'
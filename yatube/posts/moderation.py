@@ -0,0 +1,123 @@
+import time
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Q
+
+from core.task_queue import enqueue
+
+from .group_stats import refresh_group_stats
+from .live import recent_posts
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Post, User
+)
+
+PURGE_BATCH: int = 500
+PURGE_PAUSE: float = 0.5
+
+
+def set_posts_deleted(queryset, deleted):
+    """Скрывает или возвращает посты одним UPDATE."""
+    group_ids = set(queryset.values_list('group_id', flat=True).distinct())
+    updated = queryset.update(is_deleted=deleted)
+    refresh_group_stats(group_ids)
+    recent_posts.invalidate()
+    return updated
+
+
+def set_comments_deleted(queryset, deleted):
+    """Скрывает или возвращает комментарии одним UPDATE."""
+    return queryset.update(is_deleted=deleted)
+
+
+def raw_delete(batch):
+    """Удаляет строки пачки в обход сигналов и снимает ссылки
+    на их картинки, как это сделал бы post_delete."""
+    try:
+        field = batch.model._meta.get_field('image')
+    except FieldDoesNotExist:
+        return batch._raw_delete(batch.db)
+    with transaction.atomic():
+        names = list(
+            batch.exclude(image='').values_list('image', flat=True)
+        )
+        deleted = batch._raw_delete(batch.db)
+        for name in names:
+            field.storage.delete(name)
+    return deleted
+
+
+def delete_in_chunks(queryset, batch_size=PURGE_BATCH, pause=PURGE_PAUSE,
+                     raw=True):
+    """Удаляет строки queryset пачками по первичному ключу.
+
+    Каждая пачка — отдельный короткий DELETE, между пачками пауза,
+    чтобы не держать блокировки на горячих таблицах. С raw=True
+    сигналы и каскады не выполняются, связанные строки нужно
+    удалить заранее, а ссылки на картинки снимаются здесь же.
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(
+            queryset.order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        batch = model._base_manager.filter(pk__in=ids)
+        if raw:
+            deleted += raw_delete(batch)
+        else:
+            deleted += batch.delete()[0]
+        if pause:
+            time.sleep(pause)
+
+
+def purge_deleted(batch_size=PURGE_BATCH, pause=PURGE_PAUSE):
+    """Окончательно удаляет скрытые посты и комментарии."""
+    comments = delete_in_chunks(
+        Comment.all_objects.filter(
+            Q(is_deleted=True) | Q(post__is_deleted=True)
+        ),
+        batch_size,
+        pause
+    )
+    posts = delete_in_chunks(
+        Post.all_objects.filter(is_deleted=True),
+        batch_size,
+        pause
+    )
+    return posts, comments
+
+
+def schedule_user_removal(user):
+    """Сразу скрывает пользователя и его записи, а удаление
+    оставляет фоновой задаче."""
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        set_posts_deleted(Post.all_objects.filter(author=user), True)
+        set_comments_deleted(Comment.all_objects.filter(author=user), True)
+    enqueue('posts.tasks.purge_user', user.pk)
+
+
+def purge_user(user_id, batch_size=PURGE_BATCH, pause=PURGE_PAUSE):
+    """Удаляет пользователя, вычищая связанные строки пачками."""
+    for queryset in (
+        Comment.all_objects.filter(
+            Q(author_id=user_id) | Q(post__author_id=user_id)
+        ),
+        Post.all_objects.filter(author_id=user_id),
+        ArchivedComment.objects.filter(
+            Q(author_id=user_id) | Q(post__author_id=user_id)
+        ),
+        ArchivedPost.objects.filter(author_id=user_id),
+    ):
+        delete_in_chunks(queryset, batch_size, pause)
+    delete_in_chunks(
+        Follow.objects.filter(Q(user_id=user_id) | Q(author_id=user_id)),
+        batch_size,
+        pause,
+        raw=False
+    )
+    User.objects.filter(pk=user_id).delete()
@@ -0,0 +1,99 @@
+import math
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Follow, Post
+
+POPULAR_CACHE_KEY: str = 'posts:popular'
+POPULAR_LIMIT: int = 500
+POPULAR_WINDOW_DAYS: int = 7
+DECAY_SECONDS: int = 12 * 60 * 60
+FOLLOWER_WEIGHT: float = 0.1
+
+
+def score(comments, followers, timestamp):
+    """Рейтинг поста с затуханием по времени.
+
+    Рейтинг хранится в логарифмической шкале: затухание сводится
+    к слагаемому, растущему с датой публикации, поэтому уже
+    посчитанные рейтинги не нужно пересчитывать со временем.
+    """
+    weight = 1 + comments + FOLLOWER_WEIGHT * followers
+    return math.log2(weight) + timestamp / DECAY_SECONDS
+
+
+def rebuild_ranking():
+    """Пересчитывает рейтинг свежих постов одним проходом."""
+    since = timezone.now() - timedelta(days=POPULAR_WINDOW_DAYS)
+    rows = Post.objects.filter(pub_date__gte=since).annotate(
+        comments_count=Count('comments')
+    ).values_list('id', 'author_id', 'pub_date', 'comments_count')
+    rows = list(rows)
+    followers = dict(
+        Follow.objects.filter(
+            author_id__in={author_id for _, author_id, _, _ in rows}
+        ).values('author_id').annotate(
+            count=Count('id')
+        ).values_list('author_id', 'count')
+    )
+    ranking = []
+    for post_id, author_id, pub_date, comments in rows:
+        timestamp = pub_date.timestamp()
+        ranking.append((
+            -score(comments, followers.get(author_id, 0), timestamp),
+            post_id,
+            timestamp,
+        ))
+    ranking.sort()
+    del ranking[POPULAR_LIMIT:]
+    cache.set(POPULAR_CACHE_KEY, ranking, None)
+    return ranking
+
+
+def bump_post(post):
+    """Поднимает пост в рейтинге после нового комментария."""
+    bump_posts({post: 1})
+
+
+def bump_posts(counts):
+    """Поднимает посты в рейтинге после новых комментариев.
+
+    counts — {пост: число новых комментариев}; рейтинг читается
+    и записывается в кеш один раз на всю пачку.
+    """
+    ranking = cache.get(POPULAR_CACHE_KEY)
+    if ranking is None or not counts:
+        return
+    positions = {
+        post_id: index for index, (_, post_id, _) in enumerate(ranking)
+    }
+    dropped = set()
+    for post, comments in counts.items():
+        index = positions.get(post.pk)
+        if index is None:
+            timestamp = post.pub_date.timestamp()
+            new_score = score(comments, 0, timestamp)
+        else:
+            neg_score, _, timestamp = ranking[index]
+            dropped.add(index)
+            weight = 2 ** (-neg_score - timestamp / DECAY_SECONDS)
+            new_score = (
+                math.log2(weight + comments) + timestamp / DECAY_SECONDS
+            )
+        ranking.append((-new_score, post.pk, timestamp))
+    ranking = sorted(
+        entry for index, entry in enumerate(ranking) if index not in dropped
+    )
+    del ranking[POPULAR_LIMIT:]
+    cache.set(POPULAR_CACHE_KEY, ranking, None)
+
+
+def popular_ids():
+    """Возвращает id популярных постов или None, если рейтинга нет."""
+    ranking = cache.get(POPULAR_CACHE_KEY)
+    if ranking is None:
+        return None
+    return [post_id for _, post_id, _ in ranking]
@@ -0,0 +1,37 @@
+from django.db import transaction
+
+from .group_stats import refresh_group_stats
+from .models import ArchivedPost, Group, Post
+
+
+def move_posts(posts, target):
+    """Переносит посты в группу target одним UPDATE."""
+    group_ids = set(posts.values_list('group_id', flat=True).distinct())
+    updated = posts.update(group=target)
+    refresh_group_stats(group_ids | {target.id})
+    return updated
+
+
+def merge_groups(sources, target, delete_sources=True):
+    """Переносит все посты групп sources в target и удаляет sources.
+
+    Посты, включая скрытые и архивные, переносятся одним UPDATE
+    на таблицу, а пересчитываются и сбрасываются в кеше только
+    затронутые группы.
+    """
+    source_ids = set(
+        sources.exclude(pk=target.pk).values_list('id', flat=True)
+    )
+    if not source_ids:
+        return 0
+    with transaction.atomic():
+        moved = Post.all_objects.filter(group_id__in=source_ids).update(
+            group=target
+        )
+        ArchivedPost.objects.filter(group_id__in=source_ids).update(
+            group=target
+        )
+        if delete_sources:
+            Group.objects.filter(id__in=source_ids).delete()
+    refresh_group_stats(source_ids | {target.id})
+    return moved
@@ -0,0 +1,170 @@
+import hashlib
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from .models import ImageRendition, Post
+
+RENDITION_DIRECTORY: str = 'renditions'
+RENDITION_QUALITY: int = 80
+RENDITIONS_TTL: int = 60 * 60
+
+MIME_TYPES = {
+    'AVIF': 'image/avif',
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+}
+EXTENSIONS = {
+    'AVIF': '.avif',
+    'WEBP': '.webp',
+    'JPEG': '.jpg',
+}
+
+
+def supported_formats():
+    """Форматы из настроек, которые умеет сохранять установленный Pillow."""
+    Image.init()
+    return [
+        image_format for image_format in settings.IMAGE_RENDITION_FORMATS
+        if image_format in Image.SAVE
+    ]
+
+
+def rendition_sizes(source_width):
+    """Размеры из настроек не шире исходника, но хотя бы один."""
+    sizes = sorted(
+        tuple(map(int, geometry.split('x')))
+        for geometry in settings.IMAGE_RENDITION_SIZES
+    )
+    return [size for size in sizes if size[0] <= source_width] or sizes[:1]
+
+
+def renditions_key(name):
+    return 'renditions:' + hashlib.md5(name.encode()).hexdigest()
+
+
+def forget_renditions(sources):
+    """Сбрасывает закешированные варианты картинок.
+
+    Кеш общий для всех процессов, поэтому сброс виден всем веб-процессам.
+    Ключи удаляются сразу и ещё раз после коммита, чтобы чтение между
+    ними не закешировало варианты, которых уже нет в базе.
+    """
+    keys = [renditions_key(source) for source in set(sources)]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def render(image, size, image_format):
+    fitted = ImageOps.fit(image, size, Image.LANCZOS)
+    buffer = BytesIO()
+    fitted.save(buffer, image_format, quality=RENDITION_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+def build_renditions(name, force=False, storage=None):
+    """Строит варианты картинки всех размеров и форматов.
+
+    Файлы кладутся в хранилище, а их адреса — в ImageRendition,
+    чтобы при отрисовке страниц не нужен был Pillow. Картинки
+    с одинаковым содержимым делят одни и те же варианты.
+    """
+    storage = storage or default_storage
+    existing = ImageRendition.objects.filter(source=name)
+    if existing.exists() and not force:
+        return 0
+    with storage.open(name) as source:
+        image = Image.open(source)
+        image = image.convert('RGB')
+    renditions = []
+    for image_format in supported_formats():
+        for width, height in rendition_sizes(image.width):
+            saved = storage.save(
+                posixpath.join(
+                    RENDITION_DIRECTORY,
+                    f'{width}x{height}{EXTENSIONS[image_format]}'
+                ),
+                render(image, (width, height), image_format)
+            )
+            renditions.append(ImageRendition(
+                source=name,
+                format=image_format,
+                width=width,
+                height=height,
+                name=saved,
+                url=storage.url(saved),
+            ))
+    with transaction.atomic():
+        drop_renditions(existing, storage)
+        ImageRendition.objects.bulk_create(renditions)
+        forget_renditions([name])
+    return len(renditions)
+
+
+def build_all_renditions(force=False):
+    """Строит варианты для всех картинок постов.
+
+    Возвращает число созданных вариантов и число картинок,
+    которые не удалось открыть.
+    """
+    built = failed = 0
+    names = Post.all_objects.exclude(image='').values_list(
+        'image', flat=True
+    ).distinct()
+    for name in names.iterator():
+        try:
+            built += build_renditions(name, force)
+        except (OSError, SuspiciousFileOperation):
+            failed += 1
+    return built, failed
+
+
+def drop_renditions(queryset, storage=None):
+    """Удаляет варианты вместе со ссылками на их файлы."""
+    storage = storage or default_storage
+    dropped = list(queryset.values_list('id', 'source', 'name'))
+    for _, _, name in dropped:
+        storage.delete(name)
+    ImageRendition.objects.filter(
+        id__in=[rendition_id for rendition_id, _, _ in dropped]
+    ).delete()
+    forget_renditions(source for _, source, _ in dropped)
+    return len(dropped)
+
+
+def renditions(names):
+    """Варианты картинок по именам исходников.
+
+    Возвращает {имя: {формат: [(ширина, адрес), ...]}}; сначала
+    смотрит в кеш, недостающие берёт одним запросом. Картинки
+    без вариантов в ответ не попадают.
+    """
+    names = {name for name in names if name}
+    keys = {renditions_key(name): name for name in names}
+    found = {
+        keys[key]: value for key, value in cache.get_many(keys).items()
+    }
+    missing = names.difference(found)
+    if missing:
+        loaded = {}
+        for source, image_format, width, url in ImageRendition.objects.filter(
+            source__in=missing
+        ).order_by('width').values_list('source', 'format', 'width', 'url'):
+            loaded.setdefault(source, {}).setdefault(
+                image_format, []
+            ).append((width, url))
+        cache.set_many(
+            {renditions_key(name): value for name, value in loaded.items()},
+            RENDITIONS_TTL
+        )
+        found.update(loaded)
+    return found
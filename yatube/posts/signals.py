@@ -0,0 +1,81 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.task_queue import enqueue
+
+from .follow_graph import forget_follow
+from .group_stats import schedule_group_stats
+from .hub import publish_comment
+from .live import recent_posts
+from .models import Comment, Follow, Group, GroupStats, Post
+from .ranking import bump_post
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        bump_post(instance.post)
+        publish_comment(instance)
+
+
+@receiver(post_init, sender=Post)
+def post_loaded(sender, instance, **kwargs):
+    instance._loaded_group_id = instance.__dict__.get('group_id')
+    image = instance.__dict__.get('image')
+    instance._loaded_image = getattr(image, 'name', image)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    schedule_group_stats({instance.group_id, instance._loaded_group_id})
+    instance._loaded_group_id = instance.group_id
+    if instance._loaded_image and (
+        instance._loaded_image != instance.image.name
+    ):
+        instance.image.storage.delete(instance._loaded_image)
+    instance._loaded_image = instance.image.name
+    transaction.on_commit(partial(recent_posts.push, instance))
+
+
+def posts_created(posts):
+    """Обработка постов, созданных bulk_create: он не отправляет post_save.
+
+    Посты без id (SQLite не возвращает их из bulk_create) кольцевой
+    буфер подхватит из базы сам.
+    """
+    schedule_group_stats({post.group_id for post in posts})
+    for post in posts:
+        if post.pk is None:
+            continue
+        if post.image:
+            enqueue('posts.tasks.build_renditions', post.pk)
+            enqueue('posts.tasks.generate_thumbnails', post.pk)
+        transaction.on_commit(partial(recent_posts.push, post))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    schedule_group_stats({instance.group_id})
+    if instance.image:
+        instance.image.storage.delete(instance.image.name)
+    transaction.on_commit(partial(recent_posts.remove, instance.id))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        forget_follow(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    forget_follow(instance.user_id, instance.author_id)
@@ -0,0 +1,73 @@
+from sorl.thumbnail import get_thumbnail
+
+from core.task_queue import task
+
+from . import (
+    archive, follow_graph, group_stats, media_gc, moderation, ranking,
+    renditions, warming
+)
+from .models import Post
+
+THUMBNAIL_GEOMETRY: str = '960x339'
+
+
+@task
+def generate_thumbnails(post_id):
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is not None and post.image:
+        get_thumbnail(
+            post.image,
+            THUMBNAIL_GEOMETRY,
+            crop='center',
+            upscale=True
+        )
+
+
+@task
+def build_renditions(post_id):
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is not None and post.image:
+        renditions.build_renditions(post.image.name)
+
+
+@task
+def rank_posts():
+    ranking.rebuild_ranking()
+
+
+@task
+def refresh_group_stats(*group_ids):
+    if group_ids:
+        group_stats.refresh_group_stats(group_ids)
+    else:
+        group_stats.rebuild_group_stats()
+
+
+@task
+def warm_cache():
+    warming.warm_cache()
+
+
+@task
+def build_follow_suggestions():
+    follow_graph.rebuild_suggestions()
+
+
+@task
+def archive_old_posts():
+    archive.archive_old_posts()
+
+
+@task
+def purge_deleted():
+    moderation.purge_deleted()
+
+
+@task
+def purge_user(user_id):
+    moderation.purge_user(user_id)
+
+
+@task
+def collect_media_garbage():
+    media_gc.collect_garbage()
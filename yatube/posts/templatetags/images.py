@@ -0,0 +1,49 @@
+from django import template
+from django.conf import settings
+
+from posts.renditions import MIME_TYPES, renditions
+
+register = template.Library()
+
+DEFAULT_WIDTH: int = 960
+
+
+def srcset(variants):
+    return ', '.join(f'{url} {width}w' for width, url in variants)
+
+
+@register.simple_tag
+def load_renditions(objects):
+    """Загружает варианты картинок всей страницы одним запросом."""
+    return renditions(obj.image.name for obj in objects if obj.image)
+
+
+@register.inclusion_tag('posts/includes/picture.html')
+def responsive_image(image, loaded=None):
+    """Картинка со srcset из заранее построенных вариантов.
+
+    Пока варианты не построены, выводится миниатюра sorl-thumbnail.
+    """
+    if loaded is None:
+        loaded = renditions([image.name])
+    formats = loaded.get(image.name, {})
+    ordered = [
+        image_format for image_format in settings.IMAGE_RENDITION_FORMATS
+        if image_format in formats
+    ]
+    context = {'image': image, 'sizes': settings.IMAGE_RENDITION_SIZES_ATTR}
+    if not ordered:
+        return context
+    fallback = 'JPEG' if 'JPEG' in formats else ordered[-1]
+    variants = formats[fallback]
+    fitting = [url for width, url in variants if width <= DEFAULT_WIDTH]
+    context.update({
+        'sources': [
+            {'type': MIME_TYPES[image_format],
+             'srcset': srcset(formats[image_format])}
+            for image_format in ordered if image_format != fallback
+        ],
+        'srcset': srcset(variants),
+        'src': fitting[-1] if fitting else variants[0][1],
+    })
+    return context
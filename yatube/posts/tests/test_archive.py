@@ -0,0 +1,127 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import StoredFile
+from posts.archive import archive_old_posts
+from posts.media_gc import collect_garbage
+from posts.models import (
+    ArchivedComment, ArchivedPost, Comment, Group, GroupStats, Post, User
+)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.old_post = Post.objects.create(
+            author=ArchiveTests.author,
+            text='Старый пост',
+            group=ArchiveTests.group
+        )
+        Comment.objects.create(
+            post=self.old_post,
+            author=ArchiveTests.author,
+            text='Старый комментарий'
+        )
+        Post.objects.filter(pk=self.old_post.pk).update(
+            pub_date=timezone.now() - timedelta(
+                days=settings.ARCHIVE_AFTER_DAYS + 1
+            )
+        )
+        self.new_post = Post.objects.create(
+            author=ArchiveTests.author,
+            text='Новый пост',
+            group=ArchiveTests.group
+        )
+
+    def test_hidden_comments_are_purged_with_post(self):
+        """Скрытый комментарий старого поста не мешает архивации."""
+        hidden = Comment.objects.create(
+            post=self.old_post,
+            author=ArchiveTests.author,
+            text='Скрытый комментарий'
+        )
+        Comment.objects.filter(pk=hidden.pk).update(is_deleted=True)
+        self.assertEqual(archive_old_posts(pause=0), 1)
+        self.assertTrue(ArchivedPost.objects.filter(
+            pk=self.old_post.pk
+        ).exists())
+        self.assertFalse(Comment.all_objects.filter(
+            post_id=self.old_post.pk
+        ).exists())
+        self.assertEqual(
+            list(ArchivedComment.objects.values_list('text', flat=True)),
+            ['Старый комментарий']
+        )
+
+    def test_old_posts_move_to_archive(self):
+        """Старые посты с комментариями переносятся в архив пачками."""
+        out = StringIO()
+        call_command('archive_posts', batch_size=1, pause=0, stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(
+            list(Post.objects.values_list('pk', flat=True)),
+            [self.new_post.pk]
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(
+            ArchivedPost.objects.filter(pk=self.old_post.pk).exists()
+        )
+        self.assertEqual(
+            ArchivedComment.objects.get().post_id,
+            self.old_post.pk
+        )
+        self.assertEqual(
+            GroupStats.objects.get(group=ArchiveTests.group).posts_count,
+            1
+        )
+
+    def test_archived_post_is_readable(self):
+        """Архивный пост открывается по прежнему адресу."""
+        call_command('archive_posts', pause=0, stdout=StringIO())
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=[self.old_post.pk])
+        )
+        self.assertTrue(response.context['archived'])
+        self.assertContains(response, 'Старый пост')
+        self.assertContains(response, 'Старый комментарий')
+
+    @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+    def test_archived_image_survives_garbage_collection(self):
+        """Архивный пост забирает ссылку на картинку, и сборщик
+        мусора её не удаляет."""
+        self.addCleanup(shutil.rmtree, TEMP_MEDIA_ROOT, ignore_errors=True)
+        Post.objects.filter(pk=self.old_post.pk).update(
+            image=default_storage.save(
+                'posts/old.gif',
+                SimpleUploadedFile('old.gif', b'old', 'image/gif')
+            )
+        )
+        call_command('archive_posts', pause=0, stdout=StringIO())
+        name = ArchivedPost.objects.get(pk=self.old_post.pk).image.name
+        collect_garbage(min_age=0, pause=0)
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(StoredFile.objects.get(name=name).refcount, 1)
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User
+from users import cache as user_cache
+
+URL_INDEX = reverse('posts:index')
+
+
+def auth_user_queries(queries):
+    return [
+        query['sql'] for query in queries
+        if '"auth_user"' in query['sql']
+    ]
+
+
+class AuthorNamesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.authors = [
+            User.objects.create_user(
+                username=f'author_{number}',
+                first_name='Автор',
+                last_name=str(number)
+            )
+            for number in range(3)
+        ]
+        for author in cls.authors:
+            Post.objects.create(author=author, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        user_cache._author_names.clear()
+        self.guest_client = Client()
+
+    def test_page_loads_names_with_one_query(self):
+        """Имена авторов страницы загружаются одним запросом,
+        а затем берутся из кеша."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(URL_INDEX)
+        self.assertEqual(len(auth_user_queries(queries)), 1)
+        self.assertContains(response, 'Автор 2')
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.guest_client.get(URL_INDEX)
+        self.assertEqual(auth_user_queries(queries), [])
+
+    def test_user_save_refreshes_name(self):
+        """Изменение имени пользователя сразу видно на карточках."""
+        self.guest_client.get(URL_INDEX)
+        author = AuthorNamesTests.authors[0]
+        author.first_name = 'Писатель'
+        author.save()
+        self.assertEqual(
+            user_cache.author_names([author.pk])[author.pk],
+            ('author_0', 'Писатель 0')
+        )
+
+    def test_missing_author_has_no_profile_link(self):
+        """Карточка поста удалённого автора рендерится без ссылки."""
+        post = Post(id=10 ** 6, author_id=10 ** 6, text='Пост без автора')
+        html = render_to_string('posts/includes/posts.html', {'post': post})
+        self.assertIn('Пост без автора', html)
+        self.assertNotIn('все посты пользователя', html)
@@ -0,0 +1,124 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import follow_graph
+from posts.models import Follow, User
+from posts.views import FOLLOWS_PER_PAGE
+
+URL_FOLLOW_INDEX = reverse('posts:follow_index')
+
+
+class FollowGraphTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader, cls.friend, cls.author_1, cls.author_2, cls.author_3 = [
+            User.objects.create_user(username=username)
+            for username in (
+                'reader', 'friend', 'author_1', 'author_2', 'author_3'
+            )
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(FollowGraphTests.reader)
+
+    def follow(self, user, *authors):
+        for author in authors:
+            Follow.objects.create(user=user, author=author)
+
+    def test_lists_follow_inserts_and_deletes(self):
+        """Закешированные списки сбрасываются при подписке и отписке
+        и читаются из кеша до следующего изменения."""
+        reader, friend = FollowGraphTests.reader, FollowGraphTests.friend
+        self.follow(reader, friend)
+        self.assertEqual(list(follow_graph.following_ids(reader.id)), [
+            friend.id
+        ])
+        self.assertEqual(list(follow_graph.follower_ids(reader.id)), [])
+        self.follow(reader, FollowGraphTests.author_1)
+        self.follow(friend, reader)
+        self.assertEqual(
+            list(follow_graph.following_ids(reader.id)),
+            [friend.id, FollowGraphTests.author_1.id]
+        )
+        self.assertEqual(list(follow_graph.mutual_ids(reader.id)), [
+            friend.id
+        ])
+        with self.assertNumQueries(0):
+            self.assertEqual(list(follow_graph.mutual_ids(reader.id)), [
+                friend.id
+            ])
+        Follow.objects.filter(user=reader, author=friend).delete()
+        self.assertFalse(follow_graph.is_following(reader.id, friend.id))
+        self.assertEqual(list(follow_graph.follower_ids(friend.id)), [])
+
+    def test_suggestions_rank_friends_of_friends(self):
+        """Рекомендации — друзья друзей по числу общих подписок."""
+        reader, friend = FollowGraphTests.reader, FollowGraphTests.friend
+        author_1 = FollowGraphTests.author_1
+        author_2 = FollowGraphTests.author_2
+        self.follow(reader, friend, author_1)
+        self.follow(friend, author_2, FollowGraphTests.author_3)
+        self.follow(author_1, author_2, reader)
+        follow_graph.rebuild_suggestions()
+        self.assertEqual(follow_graph.suggestions(reader.id), [
+            (author_2.id, 2),
+            (FollowGraphTests.author_3.id, 1),
+        ])
+        self.follow(reader, author_2)
+        self.assertEqual(follow_graph.suggestions(reader.id), [
+            (FollowGraphTests.author_3.id, 1),
+        ])
+        response = self.reader_client.get(URL_FOLLOW_INDEX)
+        self.assertContains(response, 'author_3')
+
+
+class FollowListTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        User.objects.bulk_create([
+            User(username=f'follower_{number}')
+            for number in range(FOLLOWS_PER_PAGE + 1)
+        ])
+        Follow.objects.bulk_create([
+            Follow(user=user, author=cls.author)
+            for user in User.objects.filter(username__startswith='follower')
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_followers_are_paginated_by_cursor(self):
+        """Подписчики выводятся страницами по курсору Follow.id."""
+        url = reverse('posts:followers', args=['author'])
+        response = self.guest_client.get(url)
+        self.assertEqual(len(response.context['people']), FOLLOWS_PER_PAGE)
+        self.assertEqual(
+            response.context['followers_count'],
+            FOLLOWS_PER_PAGE + 1
+        )
+        next_cursor = response.context['next_cursor']
+        response = self.guest_client.get(url, {'after': next_cursor})
+        self.assertEqual(response.context['people'], [
+            ('follower_0', '')
+        ])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_following_list_and_cached_counts(self):
+        """Счётчики подписок берутся из кеша и меняются при подписке."""
+        follower = User.objects.get(username='follower_0')
+        url = reverse('posts:following', args=['follower_0'])
+        response = self.guest_client.get(url)
+        self.assertEqual(response.context['people'], [('author', '')])
+        Follow.objects.create(user=follower, author=User.objects.get(
+            username='follower_1'
+        ))
+        response = self.guest_client.get(url)
+        self.assertEqual(response.context['following_count'], 2)
+        self.assertEqual(response.context['people'][0][0], 'follower_1')
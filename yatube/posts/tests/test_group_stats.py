@@ -0,0 +1,158 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, GroupStats, Post, User
+
+URL_GROUP_INDEX = reverse('posts:group_index')
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.author = User.objects.create_user(username='post_author')
+        cls.group_1 = Group.objects.create(
+            title='Тестовая группа_1',
+            slug='test-slug_1',
+            description='Тестовое описание_1',
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа_2',
+            slug='test-slug_2',
+            description='Тестовое описание_2',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def run_worker(self):
+        call_command('run_worker', processes=0, once=True, stdout=StringIO())
+
+    def test_stats_follow_post_changes(self):
+        """Агрегаты группы обновляются фоновой задачей при создании,
+        переносе и удалении поста."""
+        post = Post.objects.create(
+            author=GroupStatsTests.author,
+            text='Тестовый пост',
+            group=GroupStatsTests.group_1
+        )
+        Post.objects.create(
+            author=GroupStatsTests.user,
+            text='Тестовый пост_2',
+            group=GroupStatsTests.group_1
+        )
+        stats = GroupStats.objects.get(group=GroupStatsTests.group_1)
+        self.assertEqual(stats.posts_count, 0)
+        self.run_worker()
+        stats.refresh_from_db()
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(
+            stats.last_pub_date,
+            Post.objects.latest('pub_date').pub_date
+        )
+        post.group = GroupStatsTests.group_2
+        post.save()
+        self.run_worker()
+        stats.refresh_from_db()
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.top_authors, 'user')
+        self.assertEqual(
+            GroupStats.objects.get(group=GroupStatsTests.group_2).posts_count,
+            1
+        )
+        post.delete()
+        self.run_worker()
+        self.assertEqual(
+            GroupStats.objects.get(group=GroupStatsTests.group_2).posts_count,
+            0
+        )
+
+    def test_group_index_show_all_groups(self):
+        """Каталог групп выводит все группы."""
+        response = self.guest_client.get(URL_GROUP_INDEX)
+        self.assertTemplateUsed(response, 'posts/groups.html')
+        self.assertEqual(len(response.context['page_obj']), 2)
+        self.assertContains(response, GroupStatsTests.group_1.title)
+
+
+class MergeGroupsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='password'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.target, self.source_1, self.source_2 = [
+            Group.objects.create(
+                title=f'Группа {slug}',
+                slug=slug,
+                description='Тестовое описание',
+            )
+            for slug in ('target', 'source-1', 'source-2')
+        ]
+        for group in (self.target, self.source_1, self.source_2):
+            Post.objects.create(
+                author=MergeGroupsTests.author,
+                text=f'Пост из {group.slug}',
+                group=group
+            )
+        self.guest_client = Client()
+
+    def test_command_merges_groups(self):
+        """Команда переносит посты и удаляет группы-источники."""
+        target_url = reverse('posts:group_list', args=['target'])
+        self.guest_client.get(target_url)
+        call_command(
+            'merge_groups', 'target', 'source-1', 'source-2',
+            stdout=StringIO()
+        )
+        self.assertEqual(
+            list(Group.objects.values_list('slug', flat=True)),
+            ['target']
+        )
+        self.assertEqual(self.target.posts.count(), 3)
+        self.assertEqual(
+            GroupStats.objects.get(group=self.target).posts_count,
+            3
+        )
+        response = self.guest_client.get(target_url)
+        self.assertContains(response, 'Пост из source-2')
+
+    def test_command_can_keep_sources(self):
+        """С --keep-sources группы-источники остаются пустыми."""
+        call_command(
+            'merge_groups', 'target', 'source-1', '--keep-sources',
+            stdout=StringIO()
+        )
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertFalse(self.source_1.posts.exists())
+
+    def test_admin_actions_move_and_merge(self):
+        """Действия админки переносят посты и объединяют группы."""
+        admin_client = Client()
+        admin_client.force_login(MergeGroupsTests.author)
+        admin_client.post(reverse('admin:posts_post_changelist'), {
+            'action': 'move_to_group',
+            'group': self.source_1.pk,
+            '_selected_action': list(
+                self.target.posts.values_list('pk', flat=True)
+            ),
+        })
+        self.assertEqual(self.source_1.posts.count(), 2)
+        admin_client.post(reverse('admin:posts_group_changelist'), {
+            'action': 'merge_into_group',
+            'group': self.target.pk,
+            '_selected_action': [self.source_1.pk, self.source_2.pk],
+        })
+        self.assertEqual(Group.objects.get().pk, self.target.pk)
+        self.assertEqual(self.target.posts.count(), 3)
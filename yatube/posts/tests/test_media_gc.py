@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.models import StoredFile
+from posts.media_gc import collect_garbage
+from posts.models import ArchivedPost, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaGarbageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=MediaGarbageTests.author,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile('a.gif', b'used', 'image/gif')
+        )
+        self.orphan = default_storage.save(
+            'posts/b.gif',
+            ContentFile(b'orphan')
+        )
+        self.legacy = FileSystemStorage().save(
+            'posts/legacy.gif',
+            ContentFile(b'legacy')
+        )
+
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_dry_run_changes_nothing(self):
+        """Пробный запуск только перечисляет файлы без ссылок."""
+        out = StringIO()
+        call_command('collect_media_garbage', '--dry-run', '--min-age=0',
+                     stdout=out)
+        self.assertIn(self.orphan, out.getvalue())
+        self.assertIn(self.legacy, out.getvalue())
+        self.assertTrue(default_storage.exists(self.orphan))
+        self.assertTrue(default_storage.exists(self.legacy))
+
+    def test_orphans_are_deleted(self):
+        """Файлы без ссылок удаляются вместе с записями о ссылках."""
+        report = collect_garbage(min_age=0, pause=0)
+        self.assertEqual(report.deleted, 2)
+        self.assertFalse(default_storage.exists(self.orphan))
+        self.assertFalse(default_storage.exists(self.legacy))
+        self.assertFalse(StoredFile.objects.filter(name=self.orphan).exists())
+        self.assertTrue(default_storage.exists(self.post.image.name))
+
+    def test_fresh_files_are_kept(self):
+        """Недавние загрузки не трогаются: их пост мог ещё не сохраниться."""
+        report = collect_garbage()
+        self.assertEqual(report.files, 0)
+        self.assertTrue(default_storage.exists(self.orphan))
+
+    def test_archived_images_are_referenced(self):
+        """Картинки архивных постов считаются используемыми."""
+        ArchivedPost.objects.create(
+            id=self.post.id + 1,
+            text='Архивный пост',
+            pub_date=self.post.pub_date,
+            author=MediaGarbageTests.author,
+            image=self.orphan
+        )
+        collect_garbage(min_age=0, pause=0)
+        self.assertTrue(default_storage.exists(self.orphan))
+
+    def test_refcounts_are_reconciled(self):
+        """Счётчики ссылок выравниваются по базе."""
+        StoredFile.objects.filter(name=self.post.image.name).update(
+            refcount=5
+        )
+        report = collect_garbage(min_age=0, pause=0)
+        self.assertEqual(report.refcounts, 1)
+        self.assertEqual(
+            StoredFile.objects.get(name=self.post.image.name).refcount,
+            1
+        )
+
+    def test_reupload_keeps_old_orphan(self):
+        """Повторная загрузка старого файла без ссылок обновляет его
+        время, и сборщик его не удаляет."""
+        old = time.time() - 2 * settings.MEDIA_GC_MIN_AGE
+        os.utime(default_storage.path(self.orphan), (old, old))
+        self.assertEqual(
+            default_storage.save('posts/c.gif', ContentFile(b'orphan')),
+            self.orphan
+        )
+        collect_garbage(pause=0)
+        self.assertTrue(default_storage.exists(self.orphan))
@@ -0,0 +1,148 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.models import StoredFile, Task
+from posts.live import RecentPosts
+from posts.models import Comment, Follow, Group, GroupStats, Post, User
+from posts.moderation import purge_user, schedule_user_removal
+
+URL_INDEX = reverse('posts:index')
+URL_POST_ADMIN = reverse('admin:posts_post_changelist')
+URL_USER_ADMIN = reverse('admin:auth_user_changelist')
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+class ModerationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin',
+            email='admin@example.com',
+            password='password'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.posts = [
+            Post.objects.create(
+                author=self.author,
+                text=f'Тестовый пост {number}',
+                group=ModerationTests.group
+            )
+            for number in range(3)
+        ]
+        Comment.objects.create(
+            post=self.posts[0],
+            author=ModerationTests.admin,
+            text='Тестовый комментарий'
+        )
+        self.admin_client = Client()
+        self.admin_client.force_login(ModerationTests.admin)
+
+    def run_action(self, action, posts):
+        return self.admin_client.post(URL_POST_ADMIN, {
+            'action': action,
+            '_selected_action': [post.pk for post in posts],
+        })
+
+    def test_admin_hides_and_restores_posts(self):
+        """Модератор скрывает и возвращает посты из админки."""
+        self.run_action('hide', self.posts[:2])
+        self.assertEqual(
+            list(Post.objects.values_list('pk', flat=True)),
+            [self.posts[2].pk]
+        )
+        self.assertEqual(Post.all_objects.count(), 3)
+        self.assertEqual(
+            GroupStats.objects.get(group=ModerationTests.group).posts_count,
+            1
+        )
+        response = self.admin_client.get(URL_POST_ADMIN)
+        self.assertEqual(response.context['cl'].result_count, 3)
+        self.run_action('restore', self.posts[:2])
+        self.assertEqual(Post.objects.count(), 3)
+
+    def test_hidden_posts_leave_other_live_buffers(self):
+        """Буфер живой ленты в другом процессе перестраивается
+        после скрытия постов."""
+        other_process = RecentPosts()
+        self.assertEqual(len(other_process.since()), 3)
+        self.run_action('hide', self.posts[:2])
+        other_process.checked = 0.0
+        self.assertEqual(
+            [item['id'] for item in other_process.since()],
+            [self.posts[2].pk]
+        )
+
+    def test_admin_deletes_users_only_in_background(self):
+        """В админке пользователей нет обычного удаления,
+        только фоновое."""
+        response = self.admin_client.get(URL_USER_ADMIN)
+        actions = dict(response.context['action_form'].fields[
+            'action'
+        ].choices)
+        self.assertNotIn('delete_selected', actions)
+        self.assertIn('remove_in_background', actions)
+        response = self.admin_client.post(
+            reverse('admin:auth_user_delete', args=[self.author.pk]),
+            {'post': 'yes'}
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(User.objects.filter(pk=self.author.pk).exists())
+        self.admin_client.post(URL_USER_ADMIN, {
+            'action': 'remove_in_background',
+            '_selected_action': [self.author.pk],
+        })
+        self.author.refresh_from_db()
+        self.assertFalse(self.author.is_active)
+
+    def test_purge_deletes_hidden_posts(self):
+        """Скрытые посты удаляются вместе с комментариями."""
+        self.run_action('hide', self.posts[:1])
+        call_command('purge_deleted', batch_size=1, pause=0, stdout=StringIO())
+        self.assertEqual(Post.all_objects.count(), 2)
+        self.assertFalse(Comment.all_objects.exists())
+
+    @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+    def test_purge_releases_image_references(self):
+        """Окончательное удаление снимает ссылки на картинки постов."""
+        self.addCleanup(shutil.rmtree, TEMP_MEDIA_ROOT, ignore_errors=True)
+        post = Post.objects.create(
+            author=self.author,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile('a.gif', b'purged', 'image/gif')
+        )
+        name = post.image.name
+        self.run_action('hide', [post])
+        call_command('purge_deleted', pause=0, stdout=StringIO())
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+
+    def test_user_removal_runs_in_background(self):
+        """Пользователь сразу скрывается, а удаляется фоновой задачей."""
+        Follow.objects.create(user=ModerationTests.admin, author=self.author)
+        schedule_user_removal(self.author)
+        self.author.refresh_from_db()
+        self.assertFalse(self.author.is_active)
+        self.assertFalse(Post.objects.exists())
+        self.assertTrue(
+            Task.objects.filter(name='posts.tasks.purge_user').exists()
+        )
+        purge_user(self.author.pk, pause=0)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(Post.all_objects.exists())
+        self.assertFalse(Follow.objects.exists())
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Post, User
+
+
+class ProfileLoaderTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.author = User.objects.create_user(username='post_author')
+        for i in range(13):
+            Post.objects.create(author=cls.author, text=f'Тестовый пост{i}')
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.url_profile = reverse(
+            'posts:profile',
+            kwargs={'username': cls.author.username}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_profile_queries(self):
+        """Профиль загружается двумя запросами к базе."""
+        with self.assertNumQueries(2):
+            self.guest_client.get(ProfileLoaderTests.url_profile)
+
+    def test_profile_context(self):
+        """В контексте профиля есть счётчики и состояние подписки."""
+        response = self.authorized_client.get(ProfileLoaderTests.url_profile)
+        author = response.context['author']
+        self.assertEqual(author.posts_count, 13)
+        self.assertEqual(author.followers_count, 1)
+        self.assertTrue(response.context['following'])
+        self.assertEqual(response.context['page_obj'].paginator.num_pages, 2)
+        self.assertContains(response, 'Отписаться')
+
+    def test_profile_header_follows_author_changes(self):
+        """Шапка профиля обновляется при смене имени и числа подписок."""
+        self.guest_client.get(ProfileLoaderTests.url_profile)
+        Follow.objects.create(
+            user=ProfileLoaderTests.author,
+            author=ProfileLoaderTests.user
+        )
+        User.objects.filter(pk=ProfileLoaderTests.author.pk).update(
+            first_name='Лев',
+            last_name='Толстой'
+        )
+        response = self.guest_client.get(ProfileLoaderTests.url_profile)
+        self.assertContains(response, 'Все посты пользователя Лев Толстой')
+        self.assertContains(response, 'подписок: 1')
@@ -0,0 +1,90 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+from posts.ranking import (
+    POPULAR_CACHE_KEY, bump_posts, popular_ids, rebuild_ranking
+)
+
+URL_POPULAR = reverse('posts:popular')
+
+
+class RankingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='post_author')
+        cls.quiet_post = Post.objects.create(
+            author=cls.author,
+            text='Тихий пост',
+        )
+        cls.busy_post = Post.objects.create(
+            author=cls.author,
+            text='Обсуждаемый пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_commented_post_ranks_higher(self):
+        """Пост с комментариями поднимается выше в рейтинге."""
+        for i in range(3):
+            Comment.objects.create(
+                post=RankingTests.busy_post,
+                author=RankingTests.author,
+                text=f'Комментарий {i}',
+            )
+        rebuild_ranking()
+        self.assertEqual(popular_ids()[0], RankingTests.busy_post.id)
+
+    def test_comment_bumps_post_incrementally(self):
+        """Новый комментарий обновляет рейтинг без пересчёта."""
+        rebuild_ranking()
+        self.assertEqual(popular_ids()[0], RankingTests.busy_post.id)
+        Comment.objects.create(
+            post=RankingTests.quiet_post,
+            author=RankingTests.author,
+            text='Комментарий',
+        )
+        self.assertEqual(popular_ids()[0], RankingTests.quiet_post.id)
+
+    def test_bump_counts_all_new_comments(self):
+        """Пачка комментариев поднимает пост так же, как пересчёт."""
+        rebuild_ranking()
+        comments = [
+            Comment(
+                post=RankingTests.quiet_post,
+                author=RankingTests.author,
+                text=f'Комментарий {i}',
+            )
+            for i in range(3)
+        ]
+        Comment.objects.bulk_create(comments)
+        bump_posts({RankingTests.quiet_post: len(comments)})
+        bumped = cache.get(POPULAR_CACHE_KEY)
+        self.assertEqual(
+            [post_id for _, post_id, _ in bumped],
+            [RankingTests.quiet_post.id, RankingTests.busy_post.id]
+        )
+        rebuilt = rebuild_ranking()
+        for (bumped_score, _, _), (rebuilt_score, _, _) in zip(
+            bumped, rebuilt
+        ):
+            self.assertAlmostEqual(bumped_score, rebuilt_score)
+
+    def test_popular_page_show_ranked_posts(self):
+        """Страница популярного выводит посты в порядке рейтинга."""
+        Comment.objects.create(
+            post=RankingTests.quiet_post,
+            author=RankingTests.author,
+            text='Комментарий',
+        )
+        rebuild_ranking()
+        response = self.guest_client.get(URL_POPULAR)
+        self.assertTemplateUsed(response, 'posts/popular.html')
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [RankingTests.quiet_post, RankingTests.busy_post]
+        )
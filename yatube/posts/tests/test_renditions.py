@@ -0,0 +1,126 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.media_gc import collect_garbage
+from posts.models import ImageRendition, Post, User
+from posts.renditions import (
+    build_renditions, drop_renditions, renditions, supported_formats
+)
+from posts.tasks import build_renditions as build_renditions_task
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_upload(name, color='red'):
+    buffer = BytesIO()
+    Image.new('RGB', (1000, 400), color).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    IMAGE_RENDITION_SIZES=['320x113', '640x226', '1920x678'],
+    IMAGE_RENDITION_FORMATS=['AVIF', 'WEBP', 'JPEG'],
+)
+class RenditionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            author=RenditionTests.author,
+            text='Пост с картинкой',
+            image=image_upload('a.jpg')
+        )
+
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_renditions_are_built(self):
+        """Строятся размеры не шире исходника во всех доступных форматах."""
+        build_renditions_task(self.post.id)
+        formats = supported_formats()
+        self.assertIn('JPEG', formats)
+        self.assertEqual(
+            set(ImageRendition.objects.values_list('format', 'width')),
+            {(image_format, width)
+             for image_format in formats for width in (320, 640)}
+        )
+        for rendition in ImageRendition.objects.all():
+            self.assertTrue(default_storage.exists(rendition.name))
+
+    def test_identical_images_share_renditions(self):
+        """Одинаковые картинки используют одни и те же варианты."""
+        build_renditions(self.post.image.name)
+        other = Post.objects.create(
+            author=RenditionTests.author,
+            text='Та же картинка',
+            image=image_upload('b.jpg')
+        )
+        self.assertEqual(other.image.name, self.post.image.name)
+        self.assertEqual(build_renditions(other.image.name), 0)
+
+    def test_renditions_are_loaded_in_one_query(self):
+        """Варианты страницы берутся одним запросом, затем из кеша."""
+        other = Post.objects.create(
+            author=RenditionTests.author,
+            text='Другая картинка',
+            image=image_upload('b.jpg', 'blue')
+        )
+        build_renditions(self.post.image.name)
+        build_renditions(other.image.name)
+        names = [self.post.image.name, other.image.name]
+        with self.assertNumQueries(1):
+            loaded = renditions(names)
+        self.assertEqual(set(loaded), set(names))
+        with self.assertNumQueries(0):
+            renditions(names)
+
+    def test_dropped_renditions_leave_cache(self):
+        """Снятые варианты сразу пропадают из общего кеша."""
+        name = self.post.image.name
+        build_renditions(name)
+        self.assertIn(name, renditions([name]))
+        drop_renditions(ImageRendition.objects.filter(source=name))
+        with self.assertNumQueries(1):
+            self.assertEqual(renditions([name]), {})
+
+    def test_page_uses_srcset(self):
+        """Карточка поста выводит srcset и sizes из вариантов."""
+        build_renditions(self.post.image.name)
+        response = self.guest_client.get(reverse('posts:index'))
+        url = ImageRendition.objects.get(format='JPEG', width=320).url
+        self.assertContains(response, f'{url} 320w')
+        self.assertContains(response, settings.IMAGE_RENDITION_SIZES_ATTR)
+
+    def test_page_falls_back_to_thumbnail(self):
+        """Пока вариантов нет, выводится обычная миниатюра."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        self.assertContains(response, '<img class="card-img my-2"')
+        self.assertNotContains(response, 'srcset')
+
+    def test_unused_renditions_are_collected(self):
+        """Сборщик мусора снимает варианты удалённых картинок."""
+        build_renditions(self.post.image.name)
+        names = list(ImageRendition.objects.values_list('name', flat=True))
+        Post.objects.filter(pk=self.post.pk).update(image='')
+        report = collect_garbage(min_age=0, pause=0)
+        self.assertEqual(report.renditions, len(names))
+        self.assertFalse(ImageRendition.objects.exists())
+        for name in names:
+            self.assertFalse(default_storage.exists(name))
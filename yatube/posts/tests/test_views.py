@@ -62,7 +62,10 @@ class PostPagesTests(TestCase):
             with self.subTest(page=page):
                 response = self.authorized_client.get(page)
                 context_image = response.context.get('post').image
-                self.assertEqual(context_image, 'posts/small.gif')
+                self.assertRegex(
+                    context_image.name,
+                    r'^posts/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.gif$'
+                )
 
     def test_pages_uses_correct_template(self):
         """URL-адрес использует соответствующий шаблон."""
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.warming import warm_cache
+
+
+class WarmCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='post_author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group
+        )
+        call_command('run_worker', processes=0, once=True, stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+
+    def test_warm_cache_renders_hot_pages(self):
+        """Прогрев рендерит ленты и заполняет кеш главной страницы."""
+        results = dict(warm_cache(pages=2))
+        url_profile = reverse(
+            'posts:profile',
+            kwargs={'username': WarmCacheTests.author.username}
+        )
+        self.assertNotIn(url_profile, results)
+        self.assertEqual(
+            results[reverse('posts:index') + '?page=1'],
+            HTTPStatus.OK
+        )
+        self.assertIsNotNone(
+            cache.get(make_template_fragment_key('index_page', [1]))
+        )
+
+    @override_settings(WARM_CACHE_HOST='127.0.0.1')
+    def test_warmed_page_is_served_to_site_host(self):
+        """Страница, прогретая для хоста сайта, отдаётся из кеша."""
+        url = reverse('posts:popular') + '?page=1'
+        self.assertEqual(dict(warm_cache(pages=1))[url], HTTPStatus.OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_HOST='127.0.0.1')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    @override_settings(WARM_CACHE_HOST='127.0.0.1')
+    def test_warmed_page_is_not_served_to_logged_in_user(self):
+        """Вошедший пользователь не получает прогретую страницу гостя."""
+        url = reverse('posts:popular') + '?page=1'
+        warm_cache(pages=1)
+        client = Client()
+        client.force_login(WarmCacheTests.author)
+        response = client.get(url, HTTP_HOST='127.0.0.1')
+        self.assertContains(response, WarmCacheTests.author.username)
+        self.assertContains(response, reverse('posts:follow_index'))
@@ -6,6 +6,8 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('popular/', views.popular, name='popular'),
+    path('group/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
@@ -26,5 +28,15 @@ urlpatterns = [
         'profile/<str:username>/unfollow/',
         views.profile_unfollow,
         name='profile_unfollow'
-    )
+    ),
+    path(
+        'profile/<str:username>/followers/',
+        views.followers,
+        name='followers'
+    ),
+    path(
+        'profile/<str:username>/following/',
+        views.following,
+        name='following'
+    ),
 ]
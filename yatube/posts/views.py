@@ -2,12 +2,27 @@ from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, render
 from django.shortcuts import redirect
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_cookie
+
+from core.task_queue import enqueue
+from users.cache import author_names
 
 from .forms import PostForm, CommentForm
 
-from .models import Group, Post, User, Comment, Follow
+from .models import (
+    ArchivedPost, Group, GroupStats, Post, User, Comment, Follow
+)
+from .follow_graph import (
+    COLUMNS, FOLLOWERS, FOLLOWING, follow_counts, suggestions
+)
+from .loaders import load_profile
+from .ranking import POPULAR_LIMIT, popular_ids
+from .tasks import build_renditions, generate_thumbnails
 
 NUMBER_OF_POSTS: int = 10
+FOLLOWS_PER_PAGE: int = 50
+POPULAR_CACHE_TIMEOUT: int = 60
 
 
 def paginator(request, posts):
@@ -18,7 +33,7 @@ def paginator(request, posts):
 
 
 def index(request):
-    posts = Post.objects.all()
+    posts = Post.objects.select_related('group')
     context = {
         'posts': posts,
         'page_obj': paginator(request, posts),
@@ -26,6 +41,28 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+# Vary: Cookie ставится до cache_page: иначе ответ попадёт в кеш
+# без него, и вошедшим пользователям отдастся страница гостя.
+@cache_page(POPULAR_CACHE_TIMEOUT, key_prefix='popular')
+@vary_on_cookie
+def popular(request):
+    ids = popular_ids()
+    if ids is None:
+        ids = list(Post.objects.values_list('id', flat=True)[:POPULAR_LIMIT])
+    page_obj = paginator(request, ids)
+    posts = Post.objects.select_related('group').in_bulk(
+        page_obj.object_list
+    )
+    page_obj.object_list = [
+        posts[post_id] for post_id in page_obj.object_list
+        if post_id in posts
+    ]
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/popular.html', context)
+
+
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     posts = group.posts.select_related('group')
@@ -36,32 +73,59 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+def group_index(request):
+    groups = GroupStats.objects.select_related('group')
+    context = {
+        'page_obj': paginator(request, groups),
+    }
+    return render(request, 'posts/groups.html', context)
+
+
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('author')
-    follow = Follow.objects.filter(
-        user__id=request.user.id,
-        author=author).exists() and request.user != author
+    author, page_obj = load_profile(request, username, NUMBER_OF_POSTS)
+    own_profile = request.user.id == author.id
     context = {
         'author': author,
-        'follow': follow,
-        'page_obj': paginator(request, posts),
+        'following': author.is_followed and not own_profile,
+        'own_profile': own_profile,
+        'page_obj': page_obj,
     }
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None:
+        return archived_post_detail(request, post_id)
     comments = Comment.objects.filter(post_id=post_id)
     form = CommentForm()
     context = {
         'post': post,
+        'author_posts_count': Post.objects.filter(
+            author_id=post.author_id
+        ).count(),
         'form': form,
         'comments': comments
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def archived_post_detail(request, post_id):
+    post = get_object_or_404(
+        ArchivedPost.objects.select_related('group'),
+        pk=post_id
+    )
+    context = {
+        'post': post,
+        'author_posts_count': Post.objects.filter(
+            author_id=post.author_id
+        ).count(),
+        'comments': post.comments.all(),
+        'archived': True,
+    }
+    return render(request, 'posts/post_detail.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
@@ -72,6 +136,9 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        if post.image:
+            enqueue(build_renditions, post.id)
+            enqueue(generate_thumbnails, post.id)
         return redirect('posts:profile', post.author)
     context = {'form': form}
     return render(request, 'posts/create.html', context)
@@ -95,7 +162,10 @@ def post_edit(request, post_id):
             instance=post
         )
         if form.is_valid():
-            form.save()
+            post = form.save()
+            if 'image' in form.changed_data and post.image:
+                enqueue(build_renditions, post.id)
+                enqueue(generate_thumbnails, post.id)
             return redirect('posts:post_detail', post_id=post_id)
     context = {
         'post': post,
@@ -123,10 +193,13 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    posts = Post.objects.select_related('group').filter(
+        author__following__user=request.user
+    )
     context = {
         'posts': posts,
         'page_obj': paginator(request, posts),
+        'suggestions': suggestions(request.user.id),
     }
     return render(request, 'posts/follow.html', context)
 
@@ -147,3 +220,40 @@ def profile_unfollow(request, username):
     if follower.exists():
         follower.delete()
     return redirect("posts:profile", username=username)
+
+
+def follow_list(request, username, direction):
+    """Подписчики или подписки автора с keyset-пагинацией по Follow.id."""
+    author = get_object_or_404(
+        User.objects.only('id', 'username', 'first_name', 'last_name'),
+        username=username
+    )
+    source, target = COLUMNS[direction]
+    follows = Follow.objects.filter(**{source: author.id}).order_by('-id')
+    after = request.GET.get('after', '')
+    if after.isdigit():
+        follows = follows.filter(id__lt=int(after))
+    rows = list(follows.values_list('id', target)[:FOLLOWS_PER_PAGE + 1])
+    next_cursor = None
+    if len(rows) > FOLLOWS_PER_PAGE:
+        rows = rows[:FOLLOWS_PER_PAGE]
+        next_cursor = rows[-1][0]
+    names = author_names(user_id for _, user_id in rows)
+    followers_count, following_count = follow_counts(author.id)
+    context = {
+        'author': author,
+        'direction': direction,
+        'people': [names[user_id] for _, user_id in rows if user_id in names],
+        'next_cursor': next_cursor,
+        'followers_count': followers_count,
+        'following_count': following_count,
+    }
+    return render(request, 'posts/follow_list.html', context)
+
+
+def followers(request, username):
+    return follow_list(request, username, FOLLOWERS)
+
+
+def following(request, username):
+    return follow_list(request, username, FOLLOWING)
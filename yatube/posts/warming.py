@@ -0,0 +1,53 @@
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+WARM_PAGES: int = 3
+
+
+def warm_urls(pages=WARM_PAGES):
+    """Адреса страниц, которые нужно прогреть в кеше.
+
+    Кешируются только ленты: фрагмент главной и cache_page популярного.
+    Группы и профили не кешируются, прогревать их незачем.
+    """
+    feeds = [reverse('posts:index'), reverse('posts:popular')]
+    return [
+        f'{feed}?page={page}'
+        for feed in feeds
+        for page in range(1, pages + 1)
+    ]
+
+
+def render_url(url):
+    """Рендерит страницу анонимным запросом, заполняя кеш.
+
+    Запрос идёт на боевой хост сайта, чтобы ключи cache_page
+    совпали с ключами запросов посетителей.
+    """
+    request = RequestFactory().get(
+        url,
+        HTTP_HOST=settings.WARM_CACHE_HOST,
+        secure=settings.WARM_CACHE_SECURE
+    )
+    request.user = AnonymousUser()
+    request.resolver_match = resolve(request.path_info)
+    func, args, kwargs = request.resolver_match
+    response = func(request, *args, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return url, response.status_code
+
+
+def warm_cache(pages=WARM_PAGES, processes=0):
+    """Прогревает кеш страниц, при processes > 0 — в пуле процессов."""
+    urls = warm_urls(pages)
+    if not processes:
+        return [render_url(url) for url in urls]
+    connections.close_all()
+    with Pool(processes, initializer=connections.close_all) as pool:
+        return pool.map(render_url, urls)
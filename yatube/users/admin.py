@@ -0,0 +1,47 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+
+from posts.moderation import schedule_user_removal
+
+User = get_user_model()
+
+
+class BackgroundDeleteUserAdmin(UserAdmin):
+    """Удаляет пользователей только фоновой задачей.
+
+    Обычное удаление собирает и стирает все связанные записи в одном
+    запросе к админке, поэтому оно и действие delete_selected
+    отключены; право на удаление проверяет действие
+    remove_in_background.
+    """
+
+    actions = ('remove_in_background',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def has_remove_permission(self, request):
+        return super().has_delete_permission(request)
+
+    def remove_in_background(self, request, queryset):
+        users = list(queryset)
+        for user in users:
+            schedule_user_removal(user)
+        self.message_user(
+            request,
+            f'Пользователей поставлено на удаление: {len(users)}'
+        )
+    remove_in_background.short_description = (
+        'Скрыть и удалить в фоне выбранных пользователей'
+    )
+    remove_in_background.allowed_permissions = ('remove',)
+
+
+admin.site.unregister(User)
+admin.site.register(User, BackgroundDeleteUserAdmin)
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+USER_RECORD_TTL: int = 10 * 60
+AUTHOR_NAMES_TTL: int = 24 * 60 * 60
+AUTHOR_NAMES_LOCAL_TTL: int = 60
+AUTHOR_NAMES_LOCAL_LIMIT: int = 10000
+
+User = get_user_model()
+
+_author_names = OrderedDict()
+_author_names_lock = threading.Lock()
+
+
+def user_record_key(session_key, session_hash):
+    return f'users:session:{session_key}:{session_hash}'
+
+
+def user_version_key(user_id):
+    return f'users:{user_id}:version'
+
+
+def author_name_key(user_id):
+    return f'users:{user_id}:name'
+
+
+def author_names(user_ids):
+    """Username и отображаемое имя авторов по id.
+
+    Имена берутся из памяти процесса, затем из общего кеша,
+    а недостающие — одним IN-запросом к базе.
+    """
+    now = time.monotonic()
+    names = {}
+    missing = set()
+    with _author_names_lock:
+        for user_id in set(user_ids):
+            entry = _author_names.get(user_id)
+            if entry is not None and entry[0] > now:
+                names[user_id] = entry[1]
+            else:
+                missing.add(user_id)
+    if not missing:
+        return names
+    keys = {author_name_key(user_id): user_id for user_id in missing}
+    found = {
+        keys[key]: value for key, value in cache.get_many(keys).items()
+    }
+    missing.difference_update(found)
+    if missing:
+        loaded = {
+            pk: (username, f'{first_name} {last_name}'.strip())
+            for pk, username, first_name, last_name
+            in User.objects.filter(pk__in=missing).values_list(
+                'pk', 'username', 'first_name', 'last_name'
+            )
+        }
+        cache.set_many(
+            {author_name_key(pk): value for pk, value in loaded.items()},
+            AUTHOR_NAMES_TTL
+        )
+        found.update(loaded)
+    expires = now + AUTHOR_NAMES_LOCAL_TTL
+    with _author_names_lock:
+        for user_id, value in found.items():
+            _author_names.pop(user_id, None)
+            _author_names[user_id] = (expires, value)
+        while len(_author_names) > AUTHOR_NAMES_LOCAL_LIMIT:
+            _author_names.popitem(last=False)
+    names.update(found)
+    return names
+
+
+def forget_author_name(user_id):
+    cache.delete(author_name_key(user_id))
+    with _author_names_lock:
+        _author_names.pop(user_id, None)
+
+
+def invalidate_user(user_id):
+    """Делает устаревшими все закешированные записи пользователя.
+
+    Вызывается из post_save и post_delete, в том числе при смене
+    пароля и блокировке в админке. QuerySet.update() сигналов
+    не отправляет: после него invalidate_user нужно вызвать самому,
+    иначе старая запись действует до USER_RECORD_TTL.
+    """
+    cache.set(user_version_key(user_id), uuid4().hex, None)
+
+
+def cached_user_record(session_key, session_hash, user_id, load):
+    """Компактная запись пользователя сессии из общего кеша.
+
+    Ключ — сессия и её хеш, рядом хранится версия пользователя.
+    При промахе или устаревшей версии запись берётся из load().
+    """
+    record_key = user_record_key(session_key, session_hash)
+    version_key = user_version_key(user_id)
+    found = cache.get_many([record_key, version_key])
+    entry, version = found.get(record_key), found.get(version_key)
+    if entry is not None and version is not None and entry[0] == version:
+        return entry[1]
+    if version is None:
+        version = uuid4().hex
+        if not cache.add(version_key, version, None):
+            version = cache.get(version_key, version)
+    record = load()
+    if record is not None:
+        cache.set(record_key, (version, record), USER_RECORD_TTL)
+    return record
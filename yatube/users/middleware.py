@@ -0,0 +1,95 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user,
+    get_user_model
+)
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from .cache import cached_user_record
+
+USER_FIELDS = (
+    'id', 'username', 'first_name', 'last_name',
+    'is_staff', 'is_superuser', 'is_active'
+)
+LIGHT_BACKENDS = ('django.contrib.auth.backends.ModelBackend',)
+
+User = get_user_model()
+
+
+def user_field_names():
+    """Поля USER_FIELDS в порядке полей модели, как ждёт from_db."""
+    return [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in USER_FIELDS
+    ]
+
+
+def load_user_record(user_id):
+    """Поля USER_FIELDS и хеш для проверки сессии, без пароля."""
+    names = user_field_names()
+    row = User.objects.filter(pk=user_id).values_list(
+        *names, 'password'
+    ).first()
+    if row is None:
+        return None
+    return (
+        dict(zip(names, row[:-1])),
+        User(password=row[-1]).get_session_auth_hash()
+    )
+
+
+def get_light_user(request):
+    """Пользователь запроса только с нужными шаблонам полями.
+
+    Повторяет проверки django.contrib.auth.get_user; для бэкендов
+    не из LIGHT_BACKENDS вызывает её саму. Запись пользователя
+    берётся из общего кеша по сессии и её хешу, без запроса
+    к auth_user; сохранение пользователя, в том числе смена пароля
+    и блокировка, сбрасывает её во всех процессах.
+    """
+    session = request.session
+    try:
+        user_id = User._meta.pk.to_python(session[SESSION_KEY])
+        backend_path = session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    session_hash = session.get(HASH_SESSION_KEY)
+    if (
+        backend_path not in LIGHT_BACKENDS
+        or session.session_key is None
+        or not session_hash
+    ):
+        return get_user(request)
+    record = cached_user_record(
+        session.session_key,
+        session_hash,
+        user_id,
+        partial(load_user_record, user_id)
+    )
+    if record is None or not record[0]['is_active']:
+        return AnonymousUser()
+    fields, auth_hash = record
+    if not constant_time_compare(session_hash, auth_hash):
+        session.flush()
+        return AnonymousUser()
+    return User.from_db(DEFAULT_DB_ALIAS, list(fields), list(fields.values()))
+
+
+class LightAuthenticationMiddleware(AuthenticationMiddleware):
+    """Берёт пользователя из общего кеша по сессии.
+
+    Пользователь собирается только из нужных шаблонам полей,
+    остальные поля отложены и подгружаются при обращении.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_light_user(request))
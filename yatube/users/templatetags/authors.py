@@ -0,0 +1,32 @@
+from django import template
+
+from users.cache import author_names
+
+register = template.Library()
+
+UNKNOWN_AUTHOR = ('', '')
+
+
+@register.simple_tag
+def load_author_names(objects):
+    """Загружает имена авторов всей страницы одним запросом."""
+    author_names(obj.author_id for obj in objects)
+    return ''
+
+
+@register.filter
+def author_name(obj):
+    return author_names([obj.author_id]).get(
+        obj.author_id,
+        UNKNOWN_AUTHOR
+    )[1]
+
+
+@register.filter
+def author_username(obj):
+    """Username автора или пустая строка, если автора уже нет:
+    шаблоны тогда не строят ссылку на профиль."""
+    return author_names([obj.author_id]).get(
+        obj.author_id,
+        UNKNOWN_AUTHOR
+    )[0]
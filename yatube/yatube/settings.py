@@ -46,17 +46,21 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail'
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.HTMLGZipMiddleware',
+    'core.middleware.QueryStatsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.LightAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -133,10 +137,35 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# В боевом режиме статика собирается с хешами в именах и сжатыми копиями
+# и отдаётся с долгим кешированием.
+ASSETS_PRODUCTION = not DEBUG
+
+if ASSETS_PRODUCTION:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
+GZIP_MIN_LENGTH = 1024
+
+# Статичные страницы, заранее отрендеренные командой prerender_pages.
+PRERENDERED_ROOT = os.path.join(BASE_DIR, 'prerendered')
+
+PRERENDERED_MAX_AGE = 24 * 60 * 60
+
 MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Загрузки хранятся по хешу содержимого без дублей. Для S3-совместимого
+# хранилища: core.storage.ContentAddressedS3Storage (нужен django-storages).
+DEFAULT_FILE_STORAGE = 'core.storage.ContentAddressedFileSystemStorage'
+
+# Миниатюры sorl-thumbnail хранятся под своими именами.
+THUMBNAIL_STORAGE = 'django.core.files.storage.FileSystemStorage'
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -147,8 +176,120 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+# Сессии читаются из общего кеша (см. CACHES) и пишутся в базу.
+# Выход из аккаунта удаляет копию в кеше, и это видят все процессы.
+# Для нескольких серверов нужен MEMCACHED_LOCATION: файловый кеш
+# у каждого сервера свой.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Интервалы периодических задач фонового воркера, в секундах.
+PERIODIC_TASKS = {
+    'posts.tasks.rank_posts': 5 * 60,
+    'posts.tasks.warm_cache': 60,
+    'posts.tasks.build_follow_suggestions': 60 * 60,
+    'posts.tasks.archive_old_posts': 24 * 60 * 60,
+    'posts.tasks.purge_deleted': 24 * 60 * 60,
+    'posts.tasks.collect_media_garbage': 24 * 60 * 60,
+    'core.tasks.clear_expired_sessions': 24 * 60 * 60,
+    'core.tasks.prune_tasks': 24 * 60 * 60,
 }
+
+# Задачи, которые воркер ставит в очередь при запуске.
+# Хост и схема, под которыми посетители открывают сайт: прогрев кеша
+# рендерит страницы для них, чтобы ключи cache_page совпадали.
+WARM_CACHE_HOST = ALLOWED_HOSTS[0]
+WARM_CACHE_SECURE = False
+
+STARTUP_TASKS = [
+    'posts.tasks.warm_cache',
+]
+
+TASK_TIMEOUT = 10 * 60
+
+# Выполненные и упавшие задачи хранятся столько дней.
+TASK_RETENTION_DAYS = 7
+
+# Посты старше этого числа дней переносятся в архивные таблицы.
+ARCHIVE_AFTER_DAYS = 3 * 365
+
+# Размеры и форматы заранее построенных вариантов картинок постов.
+# Форматы, которые не умеет сохранять установленный Pillow, пропускаются.
+IMAGE_RENDITION_SIZES = ['320x113', '640x226', '960x339', '1920x678']
+IMAGE_RENDITION_FORMATS = ['AVIF', 'WEBP', 'JPEG']
+# Значение атрибута sizes для карточек постов.
+IMAGE_RENDITION_SIZES_ATTR = '(min-width: 1200px) 960px, 100vw'
+
+# Сборщик мусора не трогает файлы моложе этого возраста в секундах:
+# загрузка уже лежит в хранилище, а пост ещё не сохранён.
+MEDIA_GC_MIN_AGE = 24 * 60 * 60
+
+# История новых комментариев для опроса со страницы поста. Опрос может
+# попасть в любой процесс, поэтому история хранится в общем кеше.
+PUBSUB_HUB = 'posts.hub.CacheHub'
+
+# Запросы дольше порога (в секундах) пишутся в журнал медленных запросов.
+SLOW_QUERY_THRESHOLD = 0.1
+
+# Статистика запросов сбрасывается в базу фоновым потоком каждого
+# процесса раз в столько секунд, 0 — только явным вызовом flush.
+QUERY_STATS_FLUSH_INTERVAL = 30
+
+# Не больше NOT_FOUND_RATE_LIMIT ответов 404 одному клиенту
+# за NOT_FOUND_RATE_WINDOW секунд, дальше — 429.
+NOT_FOUND_RATE_LIMIT = 60
+
+NOT_FOUND_RATE_WINDOW = 60
+
+# Счётчики ошибок сбрасываются в базу фоновым потоком процесса,
+# 0 — только явным вызовом flush.
+ERROR_STATS_FLUSH_INTERVAL = 30
+
+# Сколько обратных прокси стоит перед сайтом: адрес клиента для лимитов
+# берётся из X-Forwarded-For, который они дописывают. 0 — REMOTE_ADDR.
+TRUSTED_PROXIES = 0
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.path.join(BASE_DIR, 'slow_queries.log'),
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'yatube.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Кеш общий для всех процессов и серверов: рейтинги, графы подписок,
+# сессии и счётчики лимитов. В работе это memcached: только у него
+# incr атомарен между процессами. Без MEMCACHED_LOCATION, при разработке
+# на одном сервере, используется файловый кеш; в нём incr не атомарен,
+# а при переполнении удаляется треть записей, поэтому MAX_ENTRIES большой.
+MEMCACHED_LOCATION = os.environ.get('MEMCACHED_LOCATION')
+
+if MEMCACHED_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': MEMCACHED_LOCATION.split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(BASE_DIR, 'django_cache'),
+            'OPTIONS': {
+                'MAX_ENTRIES': 100000,
+            },
+        }
+    }
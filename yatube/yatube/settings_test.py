@@ -0,0 +1,22 @@
+"""Настройки для тестов: manage.py test и pytest."""
+
+import atexit
+import shutil
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+
+# Тесты работают с чистым кешем в памяти своего процесса.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+QUERY_STATS_FLUSH_INTERVAL = 0
+
+ERROR_STATS_FLUSH_INTERVAL = 0
+
+# Загрузки из тестов не попадают в рабочий каталог media.
+MEDIA_ROOT = tempfile.mkdtemp(prefix='yatube-test-media-')
+atexit.register(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
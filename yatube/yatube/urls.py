@@ -1,14 +1,17 @@
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import static_asset
+
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('api/v1/', include('api.urls', namespace='api')),
 ]
 
 handler404 = 'core.views.page_not_found'
@@ -21,3 +24,11 @@ if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
     )
+
+if settings.ASSETS_PRODUCTION:
+    urlpatterns += [
+        re_path(
+            r'^' + settings.STATIC_URL.lstrip('/') + r'(?P<path>.+)$',
+            static_asset
+        ),
+    ]